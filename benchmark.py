@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Compare thumbnail/render paths on synthetic photos: Pillow (one call per image), the NumPy
+batch engine and the pipelined renderer. Caches are cleared before every run.
+
+    python benchmark.py --count 300
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+import render
+from render import render_html, render_html_pipelined
+from thumbnail_numpy import HAS_NUMPY
+
+# Typical upload sizes: phone photos, scans and already cropped avatars
+_PHOTO_SIZES = [(4032, 3024), (3000, 4000), (1920, 1080), (1200, 1200), (640, 480), (144, 144)]
+
+
+def _make_photos(directory: Path, count: int, seed: int) -> list[Path]:
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        w, h = rng.choice(_PHOTO_SIZES)
+        # Small noise image scaled up: cheap to create, still has real JPEG content
+        base = Image.effect_noise((max(w // 16, 1), max(h // 16, 1)), 64).convert("RGB")
+        img = base.resize((w, h), Image.BILINEAR)
+        path = directory / f"photo_{i}.jpg"
+        img.save(path, format="JPEG", quality=85)
+        paths.append(path)
+    return paths
+
+
+def _participants(photos: list[Path]) -> list[dict]:
+    return [
+        {"land": "DE", "plz": "", "ort": "", "rufname": f"Person {i}", "couch": "", "image_path": str(path)}
+        for i, path in enumerate(photos)
+    ]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark der Vorschaubild- und Render-Pfade")
+    parser.add_argument("--count", type=int, default=100, help="Anzahl Testbilder")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="pan_bench_") as tmp:
+        tmp_path = Path(tmp)
+        print(f"Erzeuge {args.count} Testbilder ...")
+        photos = _make_photos(tmp_path, args.count, args.seed)
+
+        runs = {
+            "pillow": lambda out: render_html(_participants(photos), out, thumbnail_engine="pillow"),
+            "pipelined (pillow)": lambda out: render_html_pipelined(iter(_participants(photos)), out),
+        }
+        if HAS_NUMPY:
+            runs["numpy batch"] = lambda out: render_html(_participants(photos), out, thumbnail_engine="numpy")
+        else:
+            print("numpy nicht installiert: NumPy-Engine wird übersprungen.")
+
+        results = {}
+        for name, run in runs.items():
+            render.clear_caches()
+            start = time.perf_counter()
+            run(tmp_path / "out.html")
+            results[name] = time.perf_counter() - start
+
+        baseline = results["pillow"]
+        print(f"{'Pfad':<22}{'Sekunden':>10}{'vs. pillow':>12}")
+        for name, seconds in results.items():
+            print(f"{name:<22}{seconds:>10.2f}{baseline / seconds:>11.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
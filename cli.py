@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Command line interface for PAN Kontaktliste: generate one or more HTML contact lists without the GUI.
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+from openpyxl.utils.exceptions import InvalidFileException
+
+from excel_reader import HeaderError, iter_participants, load_participants, validate_headers
+from render import (
+    DEFAULT_TEMPLATE,
+    THUMBNAIL_ENGINES,
+    RenderSummary,
+    render_html_pipelined,
+    render_variants,
+    resource_path,
+)
+
+# Unreadable input: missing file, not an xlsx workbook
+_INPUT_ERRORS = (OSError, zipfile.BadZipFile, InvalidFileException)
+
+
+def _summary_line(output: Path, summary: RenderSummary) -> str:
+    line = f"{summary.participants} Teilnehmende -> {output} ({summary.output_bytes / 1024:.0f} KiB"
+    if summary.output_format != "html":
+        line += (
+            f", {summary.output_format}: {summary.html_bytes / 1024:.0f} KiB unkomprimiert,"
+            f" Kompression {summary.compression_ratio:.1f}:1"
+        )
+    return line + ")"
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pan-kontaktliste",
+        description="Erstellt aus einer Excel-Anmeldeliste eine HTML-Kontaktliste.",
+    )
+    parser.add_argument("xlsx", type=Path, help="Excel-Anmeldeliste (.xlsx)")
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="Ziel-HTML-Datei (Standardvorlage); .html.gz schreibt gzip-komprimiert, .zip ein Paket mit Bildern",
+    )
+    parser.add_argument(
+        "--variant",
+        nargs=2,
+        action="append",
+        default=[],
+        metavar=("VORLAGE", "AUSGABE"),
+        help=(
+            "Zusätzliche Variante: Vorlagenname (im Vorlagenordner) und Ziel-HTML-Datei. "
+            "Mehrfach angebbar; die Excel-Datei wird dabei nur einmal gelesen."
+        ),
+    )
+    parser.add_argument("--meetup-name", default="", help="Name des Treffens (Titel der Liste)")
+    parser.add_argument("--template-dir", type=Path, default=None, help="Eigener Vorlagenordner")
+    parser.add_argument("--placeholder", type=Path, default=None, help="Platzhalterbild")
+    parser.add_argument("--group-by", choices=("land", "plz"), default=None, help="Nach Land/PLZ gruppieren")
+    parser.add_argument("--search", action="store_true", help="Suchfeld mit Suchindex einbetten")
+    parser.add_argument(
+        "--thumbnail-engine",
+        choices=THUMBNAIL_ENGINES,
+        default="pillow",
+        help="Vorschaubilder einzeln mit Pillow oder gebündelt mit NumPy (benötigt numpy) erzeugen",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.output is None and not args.variant:
+        parser.error("Bitte --output oder mindestens eine --variant angeben.")
+
+    placeholder = args.placeholder or resource_path("data/placeholder.png")
+    if not placeholder.exists():
+        print(f"Platzhalterbild fehlt: {placeholder}", file=sys.stderr)
+        return 1
+
+    variants = [(template, Path(output)) for template, output in args.variant]
+    if args.output is not None:
+        variants.insert(0, (DEFAULT_TEMPLATE, args.output))
+
+    try:
+        # Pre-flight: header row only, so column mistakes show up before any image work
+        validate_headers(args.xlsx)
+    except (HeaderError, *_INPUT_ERRORS) as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="pan_contact_") as build_dir:
+            build_path = Path(build_dir)
+            single = len(variants) == 1 and variants[0][0] == DEFAULT_TEMPLATE
+            if single and args.group_by is None and args.thumbnail_engine == "pillow":
+                # Single default list: overlap reading, thumbnails and rendering.
+                participants = iter_participants(args.xlsx, placeholder, image_output_dir=build_path)
+                first = next(participants, None)
+                if first is None:
+                    print("In der Excel-Datei sind keine Einträge mit aktivierter Teilnehmyliste.", file=sys.stderr)
+                    return 1
+                summary = render_html_pipelined(
+                    itertools.chain([first], participants),
+                    variants[0][1],
+                    meetup_name=args.meetup_name,
+                    template_dir=args.template_dir,
+                    search_index=args.search,
+                )
+                summaries = [summary]
+            else:
+                participants = load_participants(args.xlsx, placeholder, image_output_dir=build_path)
+                if not participants:
+                    print("In der Excel-Datei sind keine Einträge mit aktivierter Teilnehmyliste.", file=sys.stderr)
+                    return 1
+                summaries = render_variants(
+                    participants,
+                    variants,
+                    meetup_name=args.meetup_name,
+                    template_dir=args.template_dir,
+                    group_by=args.group_by,
+                    search_index=args.search,
+                    thumbnail_engine=args.thumbnail_engine,
+                )
+    except (*_INPUT_ERRORS, RuntimeError) as e:
+        # RuntimeError: --thumbnail-engine numpy without numpy installed
+        print(e, file=sys.stderr)
+        return 1
+
+    for (_, output), summary in zip(variants, summaries, strict=True):
+        print(_summary_line(output, summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,18 +4,26 @@ Respects Teilnehmyliste and per-field consent; extracts images when consented.
 """
 from __future__ import annotations
 
-import os
+import difflib
+import io
 import shutil
 import tempfile
 import zipfile
+from collections.abc import Iterator, Mapping
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO
 
 import openpyxl
-from openpyxl.reader.drawings import find_images
+from openpyxl.drawing.spreadsheet_drawing import SpreadsheetDrawing
+from openpyxl.packaging.relationship import get_dependents, get_rels_path
+from openpyxl.xml.constants import IMAGE_NS
+from openpyxl.xml.functions import fromstring
+from PIL import Image
 
+from image_header import sniff_format
 
-# Column names in the spreadsheet (exact match)
+
+# Canonical column names in the spreadsheet (see HEADER_ALIASES for accepted spellings)
 CONSENT_LIST = "Teilnehmyliste"
 CONSENT_EMAIL = "Teilnehmyliste E-Mail"
 CONSENT_PHONE = "Teilnehmyliste Telefonnummer"
@@ -34,6 +42,120 @@ DATA_FAMILIENNAME = "Familiename"
 DATA_VORNAME = "Vorname"
 DATA_BILD = "Bild"
 
+# Workbook input: a path, the file's bytes or a binary file object
+WorkbookSource = str | Path | bytes | BinaryIO
+
+
+# Accepted spellings per canonical column; headers are compared case-insensitively with
+# whitespace collapsed. The sign-up form mixes "Teilnehmyliste" and "Teilnehmerliste".
+HEADER_ALIASES: dict[str, tuple[str, ...]] = {
+    CONSENT_LIST: ("Teilnehmerliste",),
+    CONSENT_EMAIL: ("Teilnehmerliste E-Mail",),
+    CONSENT_PHONE: ("Teilnehmerliste Telefonnummer",),
+    CONSENT_NACHNAME: ("Teilnehmerliste Nachname",),
+    CONSENT_VORNAME: ("Teilnehmyliste Vorname",),
+    CONSENT_BILD: ("Teilnehmerliste Bild",),
+    DATA_LAND: (),
+    DATA_PLZ: ("Postleitzahl",),
+    DATA_ORT: ("Wohnort",),
+    DATA_RUFNAME: ("Rufname", "Pseudonym"),
+    DATA_COUCH: ("Teilnehmerliste_Couch", "Teilnehmyliste Couch", "Teilnehmerliste Couch"),
+    DATA_EMAIL: ("E-Mail-Adresse", "E-Mail"),
+    DATA_PHONE: ("Telefonnummer",),
+    DATA_FAMILIENNAME: ("Familienname", "Nachname"),
+    DATA_VORNAME: (),
+    DATA_BILD: (),
+}
+
+# Columns whose absence would silently drop consented data; PLZ, Ort and Bild are optional
+REQUIRED_HEADERS: frozenset[str] = frozenset(HEADER_ALIASES) - {DATA_PLZ, DATA_ORT, DATA_BILD}
+
+
+class HeaderError(ValueError):
+    """
+    The header row lacks required columns. `missing` lists the canonical names,
+    `suggestions` maps some of them to a similar header that was found instead.
+    """
+
+    def __init__(self, missing: list[str], suggestions: dict[str, str]) -> None:
+        self.missing = missing
+        self.suggestions = suggestions
+        lines = ["In der Kopfzeile der Excel-Datei fehlen Spalten:"]
+        for name in missing:
+            hint = f' (gefunden: "{suggestions[name]}"?)' if name in suggestions else ""
+            lines.append(f'  - "{name}"{hint}')
+        super().__init__("\n".join(lines))
+
+
+def _normalize_header(value: Any) -> str:
+    return " ".join(str(value).split()).casefold()
+
+
+def resolve_headers(
+    headers: tuple | list,
+    aliases: Mapping[str, tuple[str, ...]] | None = None,
+    required: frozenset[str] | set[str] | None = None,
+) -> dict[str, int]:
+    """
+    Map canonical column names to 0-based column indexes of the header row.
+    Each canonical name matches itself or one of its aliases (first matching column wins).
+    Raises HeaderError listing every missing required column, with a close match if there is one.
+    """
+    aliases = HEADER_ALIASES if aliases is None else aliases
+    required = REQUIRED_HEADERS if required is None else required
+    positions: dict[str, int] = {}
+    for i, h in enumerate(headers):
+        if h is not None and str(h).strip():
+            positions.setdefault(_normalize_header(h), i)
+
+    columns: dict[str, int] = {}
+    for name, spellings in aliases.items():
+        for spelling in (name, *spellings):
+            i = positions.get(_normalize_header(spelling))
+            if i is not None:
+                columns[name] = i
+                break
+
+    missing = [name for name in aliases if name in required and name not in columns]
+    if missing:
+        used = set(columns.values())
+        unmatched = {_normalize_header(headers[i]): str(headers[i]).strip() for i in positions.values() if i not in used}
+        suggestions = {}
+        for name in missing:
+            close = difflib.get_close_matches(_normalize_header(name), list(unmatched), n=1, cutoff=0.75)
+            if close:
+                suggestions[name] = unmatched[close[0]]
+        raise HeaderError(missing, suggestions)
+    return columns
+
+
+def validate_headers(
+    xlsx_path: WorkbookSource,
+    aliases: Mapping[str, tuple[str, ...]] | None = None,
+    required: frozenset[str] | set[str] | None = None,
+) -> dict[str, int]:
+    """
+    Pre-flight check: read only the header row (streaming, read-only mode) and resolve it with
+    resolve_headers. Raises HeaderError within milliseconds, before any image work.
+    A file object is rewound to where it was, so it can be passed on to load_participants.
+    """
+    position = xlsx_path.tell() if hasattr(xlsx_path, "read") else None
+    try:
+        source = _workbook_source(xlsx_path)
+    finally:
+        if position is not None:
+            xlsx_path.seek(position)
+    wb = openpyxl.load_workbook(_open_source(source), read_only=True, data_only=True)
+    try:
+        sh = wb.active
+        headers = ()
+        if sh is not None:
+            sh.reset_dimensions()  # see iter_participants
+            headers = next(sh.iter_rows(max_row=1, values_only=True), ())
+    finally:
+        wb.close()
+    return resolve_headers(headers, aliases, required)
+
 
 def _truthy(value: Any) -> bool:
     """Normalize Excel booleans and strings to bool."""
@@ -56,173 +178,226 @@ def _anchor_row(anchor) -> int | None:
     return None
 
 
-def _extract_images_by_row(xlsx_path: str | Path) -> dict[int, str]:
+def _workbook_source(xlsx: WorkbookSource) -> Path | bytes:
+    """Normalize workbook input: paths stay paths, file objects are read into bytes."""
+    if isinstance(xlsx, (str, Path)):
+        return Path(xlsx)
+    if isinstance(xlsx, (bytes, bytearray, memoryview)):
+        return bytes(xlsx)
+    return xlsx.read()
+
+
+def _open_source(source: Path | bytes) -> Path | BinaryIO:
+    """Something openpyxl and zipfile can open; each call gets its own stream for bytes."""
+    return source if isinstance(source, Path) else io.BytesIO(source)
+
+
+def _image_members_by_row(archive: zipfile.ZipFile) -> dict[int, str]:
     """
-    Open xlsx as zip, find drawing for first sheet, extract images and map by Excel row (1-based).
-    Returns dict: excel_row -> path to extracted image file (temp file).
+    Find the drawing for the first sheet and map its images by Excel row (1-based).
+    Returns dict: excel_row -> zip member name of the first image anchored there. Only the drawing
+    XML and its relationships are parsed; image data is read when the row is reached (_read_image).
     """
-    path = Path(xlsx_path)
-    if not path.exists():
+    names = archive.namelist()
+    drawing_paths = [n for n in names if n.startswith("xl/drawings/") and n.endswith(".xml") and "_rels" not in n]
+    if not drawing_paths:
         return {}
 
-    row_to_path: dict[int, str] = {}
-    try:
-        with zipfile.ZipFile(path, "r") as archive:
-            names = archive.namelist()
-            drawing_paths = [n for n in names if n.startswith("xl/drawings/") and n.endswith(".xml") and "_rels" not in n]
-            if not drawing_paths:
-                return {}
-
-            # First sheet typically has drawing1.xml
-            drawing_path = "xl/drawings/drawing1.xml"
-            if drawing_path not in names:
-                drawing_path = drawing_paths[0]
-
-            charts, images = find_images(archive, drawing_path)
-    except Exception:
-        return {}
+    # First sheet typically has drawing1.xml
+    drawing_path = "xl/drawings/drawing1.xml"
+    if drawing_path not in names:
+        drawing_path = drawing_paths[0]
 
-    if not images:
+    rels_path = get_rels_path(drawing_path)
+    if rels_path not in names:
         return {}
+    drawing = SpreadsheetDrawing.from_tree(fromstring(archive.read(drawing_path)))
+    deps = get_dependents(archive, rels_path)
 
-    # Map anchor row (0-based) -> list of images; Excel data row 2 = 0-based row 1
-    by_row: dict[int, list] = {}
-    for img in images:
-        row_0 = _anchor_row(img.anchor)
-        if row_0 is not None:
-            by_row.setdefault(row_0, []).append(img)
-
-    # Save each image to a temp file and map Excel row (1-based) to path
-    for row_0, img_list in by_row.items():
-        excel_row = row_0 + 1
-        img = img_list[0]
+    # Map anchor row (0-based) -> first image; Excel data row 2 = 0-based row 1
+    row_to_member: dict[int, str] = {}
+    for rel in drawing._blip_rels:
         try:
-            data = img._data()
-            ext = (img.format or "png").lower()
-            if ext not in ("png", "jpeg", "jpg", "gif"):
-                ext = "png"
-            fd, tmp_path = tempfile.mkstemp(suffix=f".{ext}", prefix="pan_contact_")
-            os.close(fd)
-            with open(tmp_path, "wb") as f:
-                f.write(data)
-            row_to_path[excel_row] = tmp_path
-        except Exception:
+            dep = deps.get(rel.embed)
+        except KeyError:
             continue
+        row_0 = _anchor_row(rel.anchor)
+        if dep.Type == IMAGE_NS and row_0 is not None:
+            row_to_member.setdefault(row_0 + 1, dep.target)
+    return row_to_member
 
-    return row_to_path
+
+def _read_image(archive: zipfile.ZipFile, member: str) -> bytes | None:
+    """
+    Data of an embedded image, or None if it is missing or unusable. PNG, JPEG and GIF are
+    recognized by their magic bytes; anything else is kept only if Pillow can open it and it
+    is not WMF/EMF (as openpyxl's find_images does).
+    """
+    try:
+        data = archive.read(member)
+    except (KeyError, OSError, zipfile.BadZipFile):
+        return None
+    if sniff_format(data) is None:
+        try:
+            with Image.open(io.BytesIO(data)) as img:
+                if img.format.upper() == "WMF":
+                    return None
+        except Exception:
+            return None
+    return data
+
+
+def _write_image(data: bytes, dest_stem: Path) -> Path:
+    """Write image data next to dest_stem; the file extension comes from its magic bytes."""
+    dest = dest_stem.with_suffix(f".{sniff_format(data) or 'png'}")
+    dest.write_bytes(data)
+    return dest
+
+
+def iter_participants(
+    xlsx_path: WorkbookSource,
+    placeholder_image_path: str | Path,
+    image_output_dir: Path | None = None,
+    keep_images_in_memory: bool = False,
+    header_aliases: Mapping[str, tuple[str, ...]] | None = None,
+    required_headers: frozenset[str] | set[str] | None = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Stream participants row by row (same filtering and keys as load_participants).
+    The sheet is read in openpyxl's read-only mode. Up front only the drawing XML is parsed to
+    know which image belongs to which row; each consented image is read from the archive (and
+    written out) when its row is reached, so callers can start work on early participants while
+    later rows and images are still being read. The header row is validated first (see
+    resolve_headers), so a HeaderError is raised before any image is extracted.
+    """
+    source = _workbook_source(xlsx_path)
+    placeholder_image_path = Path(placeholder_image_path)
+
+    wb = openpyxl.load_workbook(_open_source(source), read_only=True, data_only=True)
+    archive: zipfile.ZipFile | None = None
+    try:
+        sh = wb.active
+        if sh is None:
+            return
+        # Read-only mode trusts the sheet's <dimension> tag, which some exporters get wrong
+        sh.reset_dimensions()
+
+        rows = sh.iter_rows(values_only=True)
+        # Header row 1: canonical column name -> index, resolved once for all rows
+        col_index = resolve_headers(next(rows, ()), header_aliases, required_headers)
+
+        if not keep_images_in_memory:
+            if image_output_dir is None:
+                image_output_dir = Path(tempfile.mkdtemp(prefix="pan_contact_images_"))
+            image_output_dir = Path(image_output_dir)
+            image_output_dir.mkdir(parents=True, exist_ok=True)
+
+        # Image members by row (Excel row number = 2, 3, ...); data is read per row below
+        try:
+            archive = zipfile.ZipFile(_open_source(source), "r")
+            row_to_image = _image_members_by_row(archive)
+        except Exception:
+            row_to_image = {}
+        placeholder_path = placeholder_image_path.resolve()
+        placeholder_bytes = placeholder_path.read_bytes() if keep_images_in_memory else b""
+
+        def _str(v: Any) -> str:
+            if v is None:
+                return ""
+            s = str(v).strip()
+            return s if s else ""
+
+        def get(row: tuple, col_key: str) -> Any:
+            j = col_index.get(col_key)
+            if j is None or j >= len(row):
+                return None
+            return row[j]
+
+        count = 0
+        for row_idx, row in enumerate(rows, start=2):
+            if not _truthy(get(row, CONSENT_LIST)):
+                continue
+
+            email_ok = _truthy(get(row, CONSENT_EMAIL))
+            phone_ok = _truthy(get(row, CONSENT_PHONE))
+            nachname_ok = _truthy(get(row, CONSENT_NACHNAME))
+            vorname_ok = _truthy(get(row, CONSENT_VORNAME))
+            bild_ok = _truthy(get(row, CONSENT_BILD))
+
+            data = None
+            if bild_ok and row_idx in row_to_image:
+                data = _read_image(archive, row_to_image[row_idx])
+
+            image: dict[str, Any] = {}
+            if keep_images_in_memory:
+                image["image_bytes"] = placeholder_bytes if data is None else data
+            else:
+                image_path = None
+                if data is not None:
+                    try:
+                        image_path = str(_write_image(data, image_output_dir / f"teilnehmer_{count}"))
+                    except Exception:
+                        image_path = None
+                if image_path is None:
+                    dest = image_output_dir / f"teilnehmer_{count}{placeholder_path.suffix}"
+                    try:
+                        shutil.copy2(placeholder_path, dest)
+                        image_path = str(dest)
+                    except Exception:
+                        image_path = str(placeholder_path)
+                image["image_path"] = image_path
+
+            p: dict[str, Any] = {
+                "land": _str(get(row, DATA_LAND)),
+                "plz": _str(get(row, DATA_PLZ)),
+                "ort": _str(get(row, DATA_ORT)),
+                "rufname": _str(get(row, DATA_RUFNAME)),
+                "couch": _str(get(row, DATA_COUCH)),
+                **image,
+            }
+            if email_ok:
+                p["email"] = _str(get(row, DATA_EMAIL))
+            if phone_ok:
+                p["phone"] = _str(get(row, DATA_PHONE))
+            if nachname_ok:
+                p["nachname"] = _str(get(row, DATA_FAMILIENNAME))
+            if vorname_ok:
+                p["vorname"] = _str(get(row, DATA_VORNAME))
+
+            count += 1
+            yield p
+    finally:
+        if archive is not None:
+            archive.close()
+        wb.close()
 
 
 def load_participants(
-    xlsx_path: str | Path,
+    xlsx_path: WorkbookSource,
     placeholder_image_path: str | Path,
     image_output_dir: Path | None = None,
+    keep_images_in_memory: bool = False,
+    header_aliases: Mapping[str, tuple[str, ...]] | None = None,
+    required_headers: frozenset[str] | set[str] | None = None,
 ) -> list[dict[str, Any]]:
     """
     Load workbook, filter by Teilnehmyliste, apply per-field consent, resolve image or placeholder.
+    xlsx_path may be a path, the workbook bytes or a binary file object.
     If image_output_dir is given, extracted/placeholder images are copied there (for LaTeX build).
     Returns list of participant dicts with keys: land, plz, ort, rufname, couch, email?, phone?,
     nachname?, vorname?, image_path (always set).
+    With keep_images_in_memory nothing is written to disk: instead of image_path each participant
+    gets image_bytes (the extracted image or the placeholder), which render.py accepts as well.
+    Headers are matched via header_aliases (default HEADER_ALIASES); a missing required column
+    (default REQUIRED_HEADERS) raises HeaderError before any image work.
     """
-    xlsx_path = Path(xlsx_path)
-    placeholder_image_path = Path(placeholder_image_path)
-    if image_output_dir is None:
-        image_output_dir = Path(tempfile.mkdtemp(prefix="pan_contact_images_"))
-    image_output_dir = Path(image_output_dir)
-    image_output_dir.mkdir(parents=True, exist_ok=True)
-
-    wb = openpyxl.load_workbook(xlsx_path, read_only=False, data_only=True)
-    sh = wb.active
-    if sh is None:
-        wb.close()
-        return []
-
-    # Header row 1
-    headers: list[str | None] = []
-    for c in sh[1]:
-        headers.append(c.value)
-    col_index: dict[str, int] = {}
-    for i, h in enumerate(headers):
-        if h is not None and str(h).strip():
-            col_index[str(h).strip()] = i
-
-    def get_col(name: str) -> int | None:
-        return col_index.get(name)
-
-    def cell(row_idx: int, col_key: str) -> Any:
-        j = get_col(col_key)
-        if j is None:
-            return None
-        row = sh[row_idx]
-        if j >= len(row):
-            return None
-        return row[j].value
-
-    # Extract images by row (Excel row number = 2, 3, ...)
-    row_to_image_path = _extract_images_by_row(xlsx_path)
-    placeholder_path = placeholder_image_path.resolve()
-
-    def _str(v: Any) -> str:
-        if v is None:
-            return ""
-        s = str(v).strip()
-        return s if s else ""
-
-    participants: list[dict[str, Any]] = []
-    for i, row_idx in enumerate(range(2, sh.max_row + 1)):
-        if not _truthy(cell(row_idx, CONSENT_LIST)):
-            continue
-
-        email_ok = _truthy(cell(row_idx, CONSENT_EMAIL))
-        phone_ok = _truthy(cell(row_idx, CONSENT_PHONE))
-        nachname_ok = _truthy(cell(row_idx, CONSENT_NACHNAME))
-        vorname_ok = _truthy(cell(row_idx, CONSENT_VORNAME))
-        bild_ok = _truthy(cell(row_idx, CONSENT_BILD))
-
-        land = _str(cell(row_idx, DATA_LAND))
-        plz = _str(cell(row_idx, DATA_PLZ))
-        ort = _str(cell(row_idx, DATA_ORT))
-        rufname = _str(cell(row_idx, DATA_RUFNAME))
-        couch = _str(cell(row_idx, DATA_COUCH))
-
-        if bild_ok and row_idx in row_to_image_path:
-            src = Path(row_to_image_path[row_idx])
-            ext = src.suffix or ".png"
-            dest = image_output_dir / f"teilnehmer_{len(participants)}{ext}"
-            try:
-                shutil.copy2(src, dest)
-                image_path = str(dest)
-            except Exception:
-                image_path = str(placeholder_path)
-            try:
-                os.unlink(src)
-            except Exception:
-                pass
-        else:
-            dest = image_output_dir / f"teilnehmer_{len(participants)}{placeholder_path.suffix}"
-            try:
-                shutil.copy2(placeholder_path, dest)
-                image_path = str(dest)
-            except Exception:
-                image_path = str(placeholder_path)
-
-        p: dict[str, Any] = {
-            "land": land,
-            "plz": plz,
-            "ort": ort,
-            "rufname": rufname,
-            "couch": couch,
-            "image_path": image_path,
-        }
-        if email_ok:
-            p["email"] = _str(cell(row_idx, DATA_EMAIL))
-        if phone_ok:
-            p["phone"] = _str(cell(row_idx, DATA_PHONE))
-        if nachname_ok:
-            p["nachname"] = _str(cell(row_idx, DATA_FAMILIENNAME))
-        if vorname_ok:
-            p["vorname"] = _str(cell(row_idx, DATA_VORNAME))
-
-        participants.append(p)
-
-    wb.close()
-    return participants
+    return list(
+        iter_participants(
+            xlsx_path,
+            placeholder_image_path,
+            image_output_dir,
+            keep_images_in_memory,
+            header_aliases,
+            required_headers,
+        )
+    )
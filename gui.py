@@ -5,8 +5,10 @@ Uses wxPython for a native look on Windows, macOS, and Linux.
 """
 from __future__ import annotations
 
+import itertools
 import sys
 import tempfile
+import threading
 import webbrowser
 from pathlib import Path
 
@@ -21,24 +23,40 @@ except ImportError:
     _HAS_SVG = False
 
 # Project modules
-from excel_reader import load_participants
-from render import render_html
+from excel_reader import HeaderError, iter_participants
+from render import display_name, preview_thumbnail, render_html_pipelined, resource_path
 from version import get_version
 
 
-def _resource_path(relative: str) -> Path:
-    """Path to a file in the project (e.g. data/placeholder.png). Supports PyInstaller frozen exe."""
-    if getattr(sys, "frozen", False):
-        base = Path(sys._MEIPASS)
-    else:
-        base = Path(__file__).resolve().parent
-    return base / relative
+def _card_lines(p: dict) -> list[str]:
+    """Text lines of a preview card, mirroring what the HTML card shows."""
+    name = display_name(p)
+    ort = p.get("land", "")
+    if p.get("plz"):
+        ort += f", {p['plz']}"
+    if p.get("ort"):
+        ort += f" {p['ort']}"
+    lines = [name or "(ohne Namen)", ort]
+    if p.get("couch"):
+        lines.append(f"Couch: {p['couch']}")
+    if p.get("email"):
+        lines.append(p["email"])
+    if p.get("phone"):
+        lines.append(p["phone"])
+    return lines
 
 
 class MainFrame(wx.Frame):
+    # Preview: first cards are shown one by one, the rest in batches; at most _PREVIEW_MAX cards.
+    _PREVIEW_FIRST = 6
+    _PREVIEW_BATCH = 12
+    _PREVIEW_MAX = 300
+
     def __init__(self) -> None:
-        super().__init__(None, title="PAN Kontaktliste", size=(580, 300))
-        self.SetMinSize((520, 280))
+        super().__init__(None, title="PAN Kontaktliste", size=(720, 620))
+        self.SetMinSize((520, 420))
+        self._preview_generation = 0
+        self._preview_count = 0
         self._app_icon = None
         self._set_icon()
 
@@ -95,6 +113,15 @@ class MainFrame(wx.Frame):
         create_btn.Bind(wx.EVT_BUTTON, self._on_create_list)
         sizer.Add(create_btn, 0, wx.ALL, 16)
 
+        # Preview of the first cards, filled in the background after an Excel file is picked
+        self.preview_status = wx.StaticText(panel, label="Vorschau: bitte Excel-Datei wählen.")
+        sizer.Add(self.preview_status, 0, wx.LEFT | wx.RIGHT, 8)
+        self.preview = wx.ScrolledWindow(panel, style=wx.VSCROLL | wx.BORDER_THEME)
+        self.preview.SetScrollRate(0, 20)
+        self._preview_sizer = wx.WrapSizer(wx.HORIZONTAL)
+        self.preview.SetSizer(self._preview_sizer)
+        sizer.Add(self.preview, 1, wx.EXPAND | wx.ALL, 8)
+
         # Menu: Help → About
         menubar = wx.MenuBar()
         help_menu = wx.Menu()
@@ -110,7 +137,7 @@ class MainFrame(wx.Frame):
     def _set_icon(self) -> None:
         if not _HAS_SVG:
             return
-        icon_path = _resource_path("data/polyamory-logo.svg")
+        icon_path = resource_path("data/polyamory-logo.svg")
         if not icon_path.exists():
             return
         try:
@@ -163,6 +190,99 @@ class MainFrame(wx.Frame):
         ) as dlg:
             if dlg.ShowModal() == wx.ID_OK:
                 self.xlsx_path.SetValue(dlg.GetPath())
+                self._start_preview(dlg.GetPath())
+
+    def _start_preview(self, xlsx: str) -> None:
+        """Clear the preview and start reading the workbook in a background thread."""
+        self._preview_generation += 1
+        self._preview_count = 0
+        self._preview_sizer.Clear(delete_windows=True)
+        self.preview.FitInside()
+        self.preview_status.SetLabel("Vorschau wird geladen ...")
+        threading.Thread(
+            target=self._preview_worker,
+            args=(xlsx, self._preview_generation),
+            name="pan_preview",
+            daemon=True,
+        ).start()
+
+    def _preview_worker(self, xlsx: str, generation: int) -> None:
+        """Background: stream participants, make low-cost thumbnails, hand cards to the GUI thread."""
+        placeholder = resource_path("data/placeholder.png")
+        # Shown for entries whose image cannot be decoded
+        fallback = preview_thumbnail({"image_path": str(placeholder)})
+        batch: list[tuple[dict, tuple[int, int, bytes] | None]] = []
+        count = 0
+        more = False
+        try:
+            participants = iter_participants(xlsx, placeholder, keep_images_in_memory=True)
+            try:
+                for p in participants:
+                    if generation != self._preview_generation:
+                        return
+                    if count >= self._PREVIEW_MAX:
+                        # Stop reading: the remaining rows would only cost image extraction
+                        more = True
+                        break
+                    count += 1
+                    batch.append((p, preview_thumbnail(p) or fallback))
+                    if count <= self._PREVIEW_FIRST or len(batch) >= self._PREVIEW_BATCH:
+                        wx.CallAfter(self._add_preview_cards, generation, batch, False)
+                        batch = []
+            finally:
+                participants.close()
+        except Exception as e:
+            wx.CallAfter(self._preview_failed, generation, str(e))
+            return
+        wx.CallAfter(self._add_preview_cards, generation, batch, True, more)
+
+    def _add_preview_cards(
+        self,
+        generation: int,
+        batch: list[tuple[dict, tuple[int, int, bytes] | None]],
+        done: bool,
+        more: bool = False,
+    ) -> None:
+        if not self or generation != self._preview_generation:
+            return
+        self.preview.Freeze()
+        try:
+            for p, thumb in batch:
+                self._preview_sizer.Add(self._make_preview_card(p, thumb), 0, wx.ALL, 4)
+            self._preview_count += len(batch)
+            self.preview.FitInside()
+            self.preview.Layout()
+        finally:
+            self.preview.Thaw()
+        if not done:
+            self.preview_status.SetLabel(f"Vorschau: {self._preview_count} Einträge ...")
+        elif self._preview_count == 0:
+            self.preview_status.SetLabel("Vorschau: keine Einträge mit aktivierter Teilnehmyliste.")
+        elif more:
+            self.preview_status.SetLabel(
+                f"Vorschau: die ersten {self._preview_count} Einträge (die Liste enthält weitere)."
+            )
+        else:
+            self.preview_status.SetLabel(f"Vorschau: {self._preview_count} Einträge.")
+
+    def _preview_failed(self, generation: int, message: str) -> None:
+        if self and generation == self._preview_generation:
+            self.preview_status.SetLabel(f"Vorschau nicht möglich: {message}")
+
+    def _make_preview_card(self, p: dict, thumb: tuple[int, int, bytes] | None) -> wx.Window:
+        card = wx.Panel(self.preview, style=wx.BORDER_SIMPLE)
+        row = wx.BoxSizer(wx.HORIZONTAL)
+        if thumb is not None:
+            w, h, rgb = thumb
+            row.Add(wx.StaticBitmap(card, bitmap=wx.Bitmap(wx.Image(w, h, rgb)), size=(48, 48)), 0, wx.ALL, 4)
+        else:
+            # Neither the image nor the placeholder could be decoded: keep the text aligned
+            row.Add((48, 48), 0, wx.ALL, 4)
+        text = wx.StaticText(card, label="\n".join(_card_lines(p)))
+        text.SetMinSize((170, -1))
+        row.Add(text, 0, wx.ALL, 4)
+        card.SetSizer(row)
+        return card
 
     def _on_choose_html(self, _event: wx.CommandEvent) -> None:
         with wx.FileDialog(
@@ -196,7 +316,7 @@ class MainFrame(wx.Frame):
             )
             return
 
-        placeholder = _resource_path("data/placeholder.png")
+        placeholder = resource_path("data/placeholder.png")
         if not placeholder.exists():
             wx.MessageBox(
                 f"Platzhalterbild fehlt: {placeholder}\nBitte legen Sie data/placeholder.png ab.",
@@ -208,8 +328,9 @@ class MainFrame(wx.Frame):
         try:
             with tempfile.TemporaryDirectory(prefix="pan_contact_") as build_dir:
                 build_path = Path(build_dir)
-                participants = load_participants(xlsx, placeholder, image_output_dir=build_path)
-                if not participants:
+                participants = iter_participants(xlsx, placeholder, image_output_dir=build_path)
+                first = next(participants, None)
+                if first is None:
                     wx.MessageBox(
                         "In der Excel-Datei sind keine Einträge mit aktivierter Teilnehmyliste.",
                         "Keine Teilnehmer",
@@ -217,7 +338,9 @@ class MainFrame(wx.Frame):
                     )
                     return
                 meetup_name = self.meetup_name.GetValue().strip()
-                render_html(participants, Path(html), meetup_name=meetup_name)
+                render_html_pipelined(
+                    itertools.chain([first], participants), Path(html), meetup_name=meetup_name
+                )
             msg = f"Die Kontaktliste wurde erstellt:\n{html}"
             if self.open_browser_cb.GetValue():
                 webbrowser.open(f"file://{Path(html).resolve()}")
@@ -225,6 +348,8 @@ class MainFrame(wx.Frame):
             wx.MessageBox(msg, "Fertig", wx.OK | wx.ICON_INFORMATION)
         except FileNotFoundError as e:
             wx.MessageBox(str(e), "Datei fehlt", wx.OK | wx.ICON_ERROR)
+        except HeaderError as e:
+            wx.MessageBox(str(e), "Spalten fehlen", wx.OK | wx.ICON_ERROR)
         except Exception as e:
             wx.MessageBox(str(e), "Fehler", wx.OK | wx.ICON_ERROR)
 
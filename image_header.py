@@ -0,0 +1,73 @@
+"""
+Identify PNG, JPEG and GIF images from their magic bytes and read their dimensions from the
+header, without decoding pixel data.
+"""
+from __future__ import annotations
+
+import struct
+
+MIME_TYPES = {"png": "image/png", "jpeg": "image/jpeg", "gif": "image/gif"}
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# JPEG start-of-frame markers carry the dimensions (C4, C8 and CC are DHT, JPG and DAC).
+_JPEG_SOF = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Markers without a length field
+_JPEG_STANDALONE = frozenset(range(0xD0, 0xDA)) | {0x01}
+
+
+def sniff_format(data: bytes) -> str | None:
+    """Return "png", "jpeg" or "gif" if data starts with that format's magic bytes, else None."""
+    if data.startswith(_PNG_SIGNATURE):
+        return "png"
+    if data.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if data.startswith((b"GIF87a", b"GIF89a")):
+        return "gif"
+    return None
+
+
+def _jpeg_size(data: bytes) -> tuple[int, int] | None:
+    i = 2
+    n = len(data)
+    while i + 4 <= n:
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in _JPEG_STANDALONE:
+            i += 2
+            continue
+        if marker in _JPEG_SOF:
+            if i + 9 > n:
+                return None
+            height, width = struct.unpack(">HH", data[i + 5 : i + 9])
+            return width, height
+        (length,) = struct.unpack(">H", data[i + 2 : i + 4])
+        i += 2 + length
+    return None
+
+
+def sniff_image(data: bytes) -> tuple[str, int, int] | None:
+    """
+    Identify format and dimensions from the header only.
+    Returns (format, width, height) for PNG, JPEG and GIF, or None if unknown or truncated.
+    """
+    fmt = sniff_format(data)
+    if fmt == "png":
+        if len(data) < 24 or data[12:16] != b"IHDR":
+            return None
+        width, height = struct.unpack(">II", data[16:24])
+        return fmt, width, height
+    if fmt == "gif":
+        if len(data) < 10:
+            return None
+        width, height = struct.unpack("<HH", data[6:10])
+        return fmt, width, height
+    if fmt == "jpeg":
+        size = _jpeg_size(data)
+        if size is None:
+            return None
+        return fmt, size[0], size[1]
+    return None
@@ -4,14 +4,49 @@ Render participant list to HTML (with optional print-to-PDF via browser).
 from __future__ import annotations
 
 import base64
+import functools
+import gzip
+import hashlib
 import io
+import os
+import queue
 import sys
+import threading
+import unicodedata
+import uuid
+import zipfile
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemLoader, nodes, select_autoescape
 from PIL import Image
 
+from image_header import MIME_TYPES, sniff_image
+
 _THUMBNAIL_SIZE = (144, 144)  # 2x display size (72px CSS) for retina
+_PREVIEW_SIZE = (48, 48)  # GUI preview cards
+DEFAULT_TEMPLATE = "contact_list.html.j2"
+# Images up to this file size that already fit the thumbnail are embedded without re-encoding
+_PASSTHROUGH_MAX_BYTES = 64 * 1024
+
+# Process-wide thumbnail cache: (content digest, size, engine) -> (bytes, MIME), least recently used first
+_THUMBNAIL_CACHE_SIZE = 512
+_thumbnail_cache: OrderedDict[tuple, tuple[bytes, str]] = OrderedDict()
+THUMBNAIL_ENGINES = ("pillow", "numpy")
+_thumbnail_lock = threading.Lock()
+# (environment, template name) -> (thumbnail size, loader's uptodate check); see _thumbnail_size
+_template_sizes: dict[tuple[Environment, str], tuple[tuple[int, int], Callable[[], bool] | None]] = {}
+
+# Where rendered HTML goes: a file path or a binary file object
+Output = str | Path | BinaryIO
+OUTPUT_FORMATS = ("html", "gzip", "zip")
+
+# group_by value -> participant keys that make up the group label
+_GROUP_KEYS = {"land": ("land",), "plz": ("land", "plz")}
 
 
 def _base_path() -> Path:
@@ -21,49 +56,631 @@ def _base_path() -> Path:
     return Path(__file__).resolve().parent
 
 
-def _image_to_data_url(image_path: str | Path) -> str:
-    """Resize image to thumbnail and return a PNG data URL."""
+def resource_path(relative: str) -> Path:
+    """Path to a file in the project (e.g. data/placeholder.png). Supports PyInstaller frozen exe."""
+    return _base_path() / relative
+
+
+def _data_url(data: bytes, mime: str) -> str:
+    return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def _passthrough(data: bytes, size: tuple[int, int]) -> tuple[bytes, str] | None:
+    """(data, MIME type) if data is a small PNG/JPEG/GIF that already fits `size`, else None."""
+    if len(data) > _PASSTHROUGH_MAX_BYTES:
+        return None
+    info = sniff_image(data)
+    if info is not None and info[1] <= size[0] and info[2] <= size[1]:
+        return data, MIME_TYPES[info[0]]
+    return None
+
+
+def _encode_thumbnail(data: bytes, size: tuple[int, int]) -> tuple[bytes, str]:
+    """
+    Thumbnail of at most `size` as (image bytes, MIME type).
+    Small PNG/JPEG/GIF files that already fit (format and size read from the header) are
+    kept as they are, without decoding and re-encoding; everything else becomes a PNG.
+    """
+    thumb = _passthrough(data, size)
+    if thumb is not None:
+        return thumb
+    with Image.open(io.BytesIO(data)) as img:
+        img.thumbnail(size, Image.LANCZOS)
+        buf = io.BytesIO()
+        img.save(buf, format="PNG", optimize=True)
+        return buf.getvalue(), "image/png"
+
+
+def _cache_key(data: bytes, size: tuple[int, int], engine: str) -> tuple:
+    return (hashlib.blake2b(data, digest_size=16).digest(), size, engine)
+
+
+def _cache_get(key: tuple) -> tuple[bytes, str] | None:
+    with _thumbnail_lock:
+        thumb = _thumbnail_cache.get(key)
+        if thumb is not None:
+            _thumbnail_cache.move_to_end(key)
+        return thumb
+
+
+def _cache_put(key: tuple, thumb: tuple[bytes, str]) -> None:
+    with _thumbnail_lock:
+        _thumbnail_cache[key] = thumb
+        while len(_thumbnail_cache) > _THUMBNAIL_CACHE_SIZE:
+            _thumbnail_cache.popitem(last=False)
+
+
+def _thumbnail(data: bytes, size: tuple[int, int] = _THUMBNAIL_SIZE) -> tuple[bytes, str] | None:
+    """
+    Thumbnail of image bytes (see _encode_thumbnail); None if it cannot be decoded.
+    Results are kept in a process-wide LRU cache keyed by image content and size, so repeated
+    images (placeholder) and repeated runs in one process (render service) are encoded once.
+    """
+    key = _cache_key(data, size, "pillow")
+    thumb = _cache_get(key)
+    if thumb is not None:
+        return thumb
+    try:
+        thumb = _encode_thumbnail(data, size)
+    except Exception:
+        return None
+    _cache_put(key, thumb)
+    return thumb
+
+
+def _thumbnails_numpy(images: list[bytes | None], size: tuple[int, int]) -> list[tuple[bytes, str] | None]:
+    """
+    Batch variant of _thumbnail using thumbnail_numpy: images that pass through unchanged or are
+    cached are handled individually, all others are decoded and resampled as one batch.
+    numpy is imported here, not at module level, so the default Pillow engine does not pay for it.
+    """
+    from thumbnail_numpy import batch_thumbnails
+
+    results: list[tuple[bytes, str] | None] = [None] * len(images)
+    pending: dict[tuple, list[int]] = {}
+    pending_data: list[bytes] = []
+    for i, data in enumerate(images):
+        if data is None:
+            continue
+        thumb = _passthrough(data, size)
+        if thumb is not None:
+            results[i] = thumb
+            continue
+        key = _cache_key(data, size, "numpy")
+        thumb = _cache_get(key)
+        if thumb is not None:
+            results[i] = thumb
+        else:
+            if key not in pending:
+                pending[key] = []
+                pending_data.append(data)
+            pending[key].append(i)
+    for (key, indices), thumb in zip(pending.items(), batch_thumbnails(pending_data, size), strict=True):
+        if thumb is None:
+            continue
+        _cache_put(key, thumb)
+        for i in indices:
+            results[i] = thumb
+    return results
+
+
+def _thumbnail_url(data: bytes, size: tuple[int, int] = _THUMBNAIL_SIZE) -> str:
+    """Data URL for a thumbnail of image bytes; "" if it cannot be decoded."""
+    thumb = _thumbnail(data, size)
+    return _data_url(*thumb) if thumb is not None else ""
+
+
+def _image_to_data_url(image_path: str | Path, size: tuple[int, int] = _THUMBNAIL_SIZE) -> str:
+    """Resize image file to thumbnail (at most `size`) and return a data URL ("" if missing)."""
     path = Path(image_path)
     if not path.exists():
         return ""
     try:
-        with Image.open(path) as img:
-            img.thumbnail(_THUMBNAIL_SIZE, Image.LANCZOS)
-            buf = io.BytesIO()
-            img.save(buf, format="PNG", optimize=True)
-            b64 = base64.b64encode(buf.getvalue()).decode("ascii")
-            return f"data:image/png;base64,{b64}"
-    except Exception:
+        data = path.read_bytes()
+    except OSError:
         return ""
+    return _thumbnail_url(data, size)
+
+
+def _participant_thumbnail(p: dict, size: tuple[int, int] = _THUMBNAIL_SIZE) -> tuple[bytes, str] | None:
+    """Thumbnail from the participant's in-memory 'image_bytes' or its 'image_path'."""
+    data = _participant_bytes(p)
+    return _thumbnail(data, size) if data is not None else None
+
+
+def _participant_bytes(p: dict) -> bytes | None:
+    data = p.get("image_bytes")
+    if data is None:
+        try:
+            data = Path(p["image_path"]).read_bytes()
+        except OSError:
+            return None
+    return data
+
+
+def _participant_thumbnails(
+    participants: list[dict], size: tuple[int, int], engine: str
+) -> list[tuple[bytes, str] | None]:
+    """Thumbnails for all participants with the chosen engine ("pillow" or "numpy")."""
+    if engine == "pillow":
+        return [_participant_thumbnail(p, size) for p in participants]
+    if engine == "numpy":
+        return _thumbnails_numpy([_participant_bytes(p) for p in participants], size)
+    raise ValueError(f"Unknown thumbnail_engine {engine!r}; expected one of {', '.join(THUMBNAIL_ENGINES)}")
+
+
+def preview_thumbnail(p: dict, size: tuple[int, int] = _PREVIEW_SIZE) -> tuple[int, int, bytes] | None:
+    """
+    Low-cost preview thumbnail for the GUI as (width, height, raw RGB bytes), or None.
+    JPEGs are decoded at reduced scale (draft mode) and resized with a cheap filter; nothing is
+    encoded, so the caller can build a bitmap from the pixels directly.
+    """
+    data = p.get("image_bytes")
+    try:
+        if data is None:
+            data = Path(p["image_path"]).read_bytes()
+        with Image.open(io.BytesIO(data)) as img:
+            img.draft("RGB", size)
+            img = img.convert("RGB")
+            img.thumbnail(size, Image.BILINEAR, reducing_gap=2.0)
+            return img.width, img.height, img.tobytes()
+    except Exception:
+        return None
+
+
+class _CountingWriter:
+    """Binary writer that counts the bytes passing through to `raw`."""
+
+    def __init__(self, raw: BinaryIO) -> None:
+        self.raw = raw
+        self.count = 0
+
+    def write(self, data: bytes) -> int:
+        if self.raw is not None:
+            self.raw.write(data)
+            self.count += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        if self.raw is not None:
+            self.raw.flush()
+
+    def discard(self) -> None:
+        """Drop everything written from now on (used to abandon a half-written container)."""
+        self.raw = None
+
+
+@dataclass(frozen=True)
+class RenderSummary:
+    """What one render run wrote: participants, uncompressed HTML size and bytes on disk/stream."""
+
+    output_format: str
+    participants: int
+    html_bytes: int
+    output_bytes: int
+
+    @property
+    def compression_ratio(self) -> float:
+        """Uncompressed HTML (plus bundled assets) per output byte; 1.0 for plain HTML."""
+        return self.html_bytes / self.output_bytes if self.output_bytes else 1.0
+
+
+def _output_format(output: Output, output_format: str | None) -> str:
+    """Explicit output_format, or inferred from the file name (.gz -> gzip, .zip -> zip)."""
+    if output_format is None:
+        if hasattr(output, "write"):
+            return "html"
+        suffix = Path(output).suffix.lower()
+        return {".gz": "gzip", ".zip": "zip"}.get(suffix, "html")
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output_format {output_format!r}; expected one of {', '.join(OUTPUT_FORMATS)}")
+    return output_format
+
+
+class _Output:
+    """
+    Destination of one rendered list, used as a context manager around the template stream.
+    "html" writes the HTML as is, "gzip" streams it through gzip, "zip" writes a bundle with the
+    HTML plus the thumbnails as separate files (referenced by relative path instead of data URLs).
+    Paths are written to a temporary file next to the target and only moved into place once
+    rendering succeeded, so a failed run never leaves a truncated list (or replaces a good one).
+    """
+
+    def __init__(self, output: Output, output_format: str | None = None) -> None:
+        self.output = output
+        self.format = _output_format(output, output_format)
+        self.html: _CountingWriter | None = None
+        self.html_bytes = 0
+        self.output_bytes = 0
+        self._assets: dict[str, bytes] = {}
+        self._assets_lock = threading.Lock()
+        self._raw: _CountingWriter | None = None
+        self._file: BinaryIO | None = None
+        self._tmp_path: Path | None = None
+        self._gzip: gzip.GzipFile | None = None
+        self._zip: zipfile.ZipFile | None = None
+        self._entry: BinaryIO | None = None
+
+    def _html_name(self) -> str:
+        if hasattr(self.output, "write"):
+            return "kontaktliste.html"
+        name = Path(self.output).name
+        for suffix in (".gz", ".zip"):
+            if name.lower().endswith(suffix):
+                name = name[: -len(suffix)]
+        return name if name.lower().endswith((".html", ".htm")) else f"{name}.html"
+
+    def image_data(self, p: dict, size: tuple[int, int]) -> str:
+        """Value for the template's p.image_data: a data URL, or an asset path in a zip bundle."""
+        return self.image_ref(_participant_thumbnail(p, size))
+
+    def image_ref(self, thumb: tuple[bytes, str] | None) -> str:
+        """image_data for an already encoded thumbnail ("" if there is none)."""
+        if thumb is None:
+            return ""
+        if self.format != "zip":
+            return _data_url(*thumb)
+        data, mime = thumb
+        ext = {"image/jpeg": "jpg", "image/gif": "gif"}.get(mime, "png")
+        name = f"bilder/{hashlib.blake2b(data, digest_size=8).hexdigest()}.{ext}"
+        with self._assets_lock:
+            self._assets.setdefault(name, data)
+        return name
+
+    def __enter__(self) -> _Output:
+        if hasattr(self.output, "write"):
+            raw = self.output
+        else:
+            target = Path(self.output)
+            self._tmp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+            raw = self._file = self._tmp_path.open("xb")
+        self._raw = _CountingWriter(raw)
+        if self.format == "gzip":
+            self._gzip = gzip.GzipFile(filename=self._html_name(), mode="wb", fileobj=self._raw, mtime=0)
+            self.html = _CountingWriter(self._gzip)
+        elif self.format == "zip":
+            self._zip = zipfile.ZipFile(self._raw, "w", compression=zipfile.ZIP_DEFLATED)
+            self._entry = self._zip.open(self._html_name(), "w")
+            self.html = _CountingWriter(self._entry)
+        else:
+            self.html = self._raw
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, *exc_info: object) -> None:
+        ok = exc_type is None
+        try:
+            if not ok:
+                # Do not finalize the gzip/zip container: a failed run must not look complete.
+                self._raw.discard()
+            if self._zip is not None:
+                self._entry.close()
+                if ok:
+                    # Thumbnails are already compressed: store them as they are.
+                    for name, data in sorted(self._assets.items()):
+                        self._zip.writestr(name, data, compress_type=zipfile.ZIP_STORED)
+                self._zip.close()
+            if self._gzip is not None:
+                self._gzip.close()
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            if self._file is not None:
+                self._file.close()
+                if ok:
+                    os.replace(self._tmp_path, self.output)
+                else:
+                    self._tmp_path.unlink(missing_ok=True)
+            self.html_bytes = self.html.count + sum(len(d) for d in self._assets.values())
+            self.output_bytes = self._raw.count
+
+    def summary(self, participants: int) -> RenderSummary:
+        return RenderSummary(self.format, participants, self.html_bytes, self.output_bytes)
+
+
+def clear_caches() -> None:
+    """Drop cached thumbnails and template environments."""
+    with _thumbnail_lock:
+        _thumbnail_cache.clear()
+    _template_sizes.clear()
+    _environment.cache_clear()
+
+
+def display_name(p: dict) -> str:
+    """Name as shown on the card: Vorname Rufname Nachname (only the parts that are set)."""
+    return " ".join(x for x in (p.get("vorname"), p.get("rufname"), p.get("nachname")) if x)
+
+
+def _fold(text: str) -> str:
+    """Lowercase and strip accents, so "Müller" is found by "muller" (mirrored in the template script)."""
+    decomposed = unicodedata.normalize("NFD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _search_text(p: dict) -> str:
+    """Search index entry for one card: name, Ort and Couch, folded."""
+    ort = " ".join(x for x in (p.get("land"), p.get("plz"), p.get("ort")) if x)
+    return _fold(" ".join(x for x in (display_name(p), ort, p.get("couch") or "") if x))
+
+
+def _group_participants(participants: list[dict], group_by: str) -> list[dict]:
+    """
+    Sort participants by Land, PLZ, Ort and name and group them by Land (group_by="land")
+    or by Land and PLZ (group_by="plz"). Entries without Land/PLZ sort last.
+    Returns list of {"label": str, "participants": list}.
+    """
+    if group_by not in _GROUP_KEYS:
+        raise ValueError(f"Unknown group_by {group_by!r}; expected one of {', '.join(_GROUP_KEYS)}")
+
+    def sort_key(p: dict) -> tuple:
+        land, plz = p.get("land") or "", p.get("plz") or ""
+        return (
+            not land,
+            land.casefold(),
+            not plz,
+            plz.casefold(),
+            (p.get("ort") or "").casefold(),
+            display_name(p).casefold(),
+        )
+
+    groups: list[dict] = []
+    for p in sorted(participants, key=sort_key):
+        label = " ".join(p.get(k) or "" for k in _GROUP_KEYS[group_by]).strip() or "Ohne Angabe"
+        if not groups or groups[-1]["label"] != label:
+            groups.append({"label": label, "participants": []})
+        groups[-1]["participants"].append(p)
+    return groups
+
+
+@functools.lru_cache(maxsize=8)
+def _environment(template_dir: Path | None) -> Environment:
+    """Jinja2 environment per template directory; cached so compiled templates stay warm."""
+    if template_dir is None:
+        template_dir = _base_path() / "template"
+    return Environment(
+        loader=FileSystemLoader(str(template_dir)),
+        autoescape=select_autoescape(["html", "htm", "xml", "j2"]),
+    )
+
+
+def _thumbnail_size(env: Environment, template_name: str) -> tuple[int, int]:
+    """
+    Thumbnail size a template asks for via a top-level `{% set thumbnail_size = 96 %}`
+    (or `(w, h)`). Read from the template source without rendering it; default _THUMBNAIL_SIZE.
+    The result is cached per environment and template until the loader reports the file changed,
+    so warm callers (render service) do not re-parse the template on every job.
+    """
+    cached = _template_sizes.get((env, template_name))
+    if cached is not None:
+        size, uptodate = cached
+        if uptodate is not None and uptodate():
+            return size
+    source, _, uptodate = env.loader.get_source(env, template_name)
+    size = _parse_thumbnail_size(env, source)
+    _template_sizes[(env, template_name)] = (size, uptodate)
+    return size
+
+
+def _parse_thumbnail_size(env: Environment, source: str) -> tuple[int, int]:
+    for node in env.parse(source).body:
+        if (
+            isinstance(node, nodes.Assign)
+            and isinstance(node.target, nodes.Name)
+            and node.target.name == "thumbnail_size"
+        ):
+            try:
+                value = node.node.as_const()
+            except nodes.Impossible:
+                break
+            if isinstance(value, int):
+                return (value, value)
+            if isinstance(value, (tuple, list)) and len(value) == 2:
+                return (int(value[0]), int(value[1]))
+            break
+    return _THUMBNAIL_SIZE
+
+
+def _context(
+    participants: list[dict],
+    meetup_name: str,
+    group_by: str | None,
+    search_index: bool,
+) -> dict:
+    """Template context: participants in output order, optional groups and search index."""
+    groups = _group_participants(participants, group_by) if group_by else None
+    ordered = [p for g in groups for p in g["participants"]] if groups else participants
+    index = None
+    if search_index:
+        index = {"t": [_search_text(p) for p in ordered]}
+        if groups:
+            index["g"] = [i for i, g in enumerate(groups) for _ in g["participants"]]
+    return {
+        "participants": ordered,
+        "groups": groups,
+        "search_index": index,
+        "meetup_name": meetup_name.strip(),
+    }
 
 
 def render_html(
     participants: list[dict],
-    output_html_path: Path,
+    output_html_path: Output,
     meetup_name: str = "",
     template_dir: Path | None = None,
-) -> None:
+    group_by: str | None = None,
+    search_index: bool = False,
+    output_format: str | None = None,
+    thumbnail_engine: str = "pillow",
+) -> RenderSummary:
     """
     Render participants to a single HTML file with embedded images (data URLs).
-    Each participant must have 'image_path' (path to image file).
+    output_html_path may also be a binary file object (e.g. io.BytesIO); the HTML is streamed into it.
+    output_format "gzip" compresses the HTML while it is written (.html.gz), "zip" writes a bundle
+    with the HTML and the thumbnails as separate files; by default it follows the file name
+    (.gz, .zip), otherwise plain HTML. Returns a RenderSummary (sizes, compression ratio).
+    Each participant must have 'image_path' (path to image file) or 'image_bytes' (image data).
     Adds 'image_data' (data URL) to each participant for the template.
     meetup_name is used as the HTML page title and h1; if empty, falls back to "Teilnehmendenkontaktliste".
+    group_by ("land" or "plz") sorts the cards and puts them under one heading per Land (or Land + PLZ).
+    search_index embeds a precomputed index (name, Ort, Couch) and a search field that filters cards
+    by index lookup instead of scanning the DOM.
     """
-    output_html_path = Path(output_html_path)
-    if template_dir is None:
-        template_dir = _base_path() / "template"
+    env = _environment(template_dir)
+    size = _thumbnail_size(env, DEFAULT_TEMPLATE)
 
-    env = Environment(
-        loader=FileSystemLoader(str(template_dir)),
-        autoescape=select_autoescape(["html", "htm", "xml", "j2"]),
-    )
+    template = env.get_template(DEFAULT_TEMPLATE)
+    thumbnails = _participant_thumbnails(participants, size, thumbnail_engine)
+    with _Output(output_html_path, output_format) as out:
+        for p, thumb in zip(participants, thumbnails, strict=True):
+            p["image_data"] = out.image_ref(thumb)
+        stream = template.stream(**_context(participants, meetup_name, group_by, search_index))
+        stream.dump(out.html, encoding="utf-8")
+    return out.summary(len(participants))
 
-    for p in participants:
-        p["image_data"] = _image_to_data_url(p["image_path"])
 
-    template = env.get_template("contact_list.html.j2")
-    html_content = template.render(
-        participants=participants,
-        meetup_name=meetup_name.strip(),
-    )
-    output_html_path.write_text(html_content, encoding="utf-8")
+def render_variants(
+    participants: list[dict],
+    variants: Iterable[tuple[str, Output]],
+    meetup_name: str = "",
+    template_dir: Path | None = None,
+    group_by: str | None = None,
+    search_index: bool = False,
+    thumbnail_engine: str = "pillow",
+) -> list[RenderSummary]:
+    """
+    Render several variants (e.g. print, compact mobile) of the same participant list.
+    variants is a list of (template name, output path or binary file object); the output format
+    follows the file name as in render_html. Thumbnails are encoded once per image and size, so
+    parsing and image work are shared; each template may ask for its own size (see
+    _thumbnail_size). The participant dicts are not modified.
+    Other arguments as in render_html. Returns one RenderSummary per variant.
+    """
+    env = _environment(template_dir)
+    thumbnails: dict[tuple[int, int], list[tuple[bytes, str] | None]] = {}
+    summaries = []
+    for template_name, output in variants:
+        size = _thumbnail_size(env, template_name)
+        if size not in thumbnails:
+            thumbnails[size] = _participant_thumbnails(participants, size, thumbnail_engine)
+        template = env.get_template(template_name)
+        with _Output(output) as out:
+            variant_participants = [
+                {**p, "image_data": out.image_ref(thumb)} for p, thumb in zip(participants, thumbnails[size], strict=True)
+            ]
+            stream = template.stream(**_context(variant_participants, meetup_name, group_by, search_index))
+            stream.dump(out.html, encoding="utf-8")
+        summaries.append(out.summary(len(participants)))
+    return summaries
+
+
+_DONE = object()
+
+
+def _put(q: queue.Queue, item: object, stop: threading.Event) -> bool:
+    """Put into a bounded queue, giving up once the consumer has stopped."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _feed_thumbnails(
+    participants: Iterable[dict],
+    image_data: Callable[[dict, tuple[int, int]], str],
+    size: tuple[int, int],
+    executor: ThreadPoolExecutor,
+    out: queue.Queue,
+    stop: threading.Event,
+) -> None:
+    """Producer: pull participants (parse stage) and hand their thumbnails to the worker pool."""
+    try:
+        for p in participants:
+            future = executor.submit(image_data, p, size)
+            if not _put(out, (p, future), stop):
+                return
+        _put(out, _DONE, stop)
+    except BaseException as e:
+        _put(out, e, stop)
+    finally:
+        close = getattr(participants, "close", None)
+        if close is not None:
+            close()
+
+
+def _in_order(out: queue.Queue) -> Iterator[dict]:
+    """Consumer: yield participants in input order as soon as their thumbnail is ready."""
+    while True:
+        item = out.get()
+        if item is _DONE:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        p, future = item
+        p["image_data"] = future.result()
+        yield p
+
+
+def render_html_pipelined(
+    participants: Iterable[dict],
+    output_html_path: Output,
+    meetup_name: str = "",
+    template_dir: Path | None = None,
+    workers: int | None = None,
+    queue_size: int = 32,
+    search_index: bool = False,
+    output_format: str | None = None,
+) -> RenderSummary:
+    """
+    Like render_html, but overlap the stages instead of running them one after another.
+    participants may be a lazy iterator (e.g. excel_reader.iter_participants); it is consumed in a
+    background thread, thumbnails are encoded by a pool of `workers` threads and cards are streamed
+    into the output file as soon as their thumbnail is ready. Bounded queues (`queue_size`) keep
+    memory flat; output order is the input order. Returns a RenderSummary as render_html does.
+    search_index and output_format work as in render_html (the index is filled while cards stream and emitted after
+    them); grouping needs the full list up front and is only available in render_html.
+    """
+    env = _environment(template_dir)
+    template = env.get_template(DEFAULT_TEMPLATE)
+    size = _thumbnail_size(env, DEFAULT_TEMPLATE)
+    if workers is None:
+        workers = min(4, os.cpu_count() or 1)
+
+    out: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+    stop = threading.Event()
+    index = {"t": []} if search_index else None
+    count = 0
+
+    def counted() -> Iterator[dict]:
+        nonlocal count
+        for p in _in_order(out):
+            count += 1
+            if index is not None:
+                index["t"].append(_search_text(p))
+            yield p
+
+    with (
+        _Output(output_html_path, output_format) as sink,
+        ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="pan_thumb") as executor,
+    ):
+        feeder = threading.Thread(
+            target=_feed_thumbnails,
+            args=(participants, sink.image_data, size, executor, out, stop),
+            name="pan_parse",
+            daemon=True,
+        )
+        feeder.start()
+        try:
+            stream = template.stream(
+                participants=counted(),
+                groups=None,
+                search_index=index,
+                meetup_name=meetup_name.strip(),
+            )
+            stream.dump(sink.html, encoding="utf-8")
+        finally:
+            stop.set()
+            feeder.join()
+    return sink.summary(count)
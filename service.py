@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Optional local render service: a long-running process that accepts a workbook upload over HTTP
+and returns the rendered HTML contact list. Template environments and thumbnails stay cached
+between jobs (see render.py), jobs run on a bounded worker pool, and /stats reports queue depth
+and job timings. Standard library only; meant for localhost, not for the open internet.
+
+    python service.py serve --port 8765
+    python service.py send anmeldungen.xlsx -o kontaktliste.html --meetup-name "PAN Wintertreffen"
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from excel_reader import load_participants
+from render import render_html, resource_path
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_UPLOAD_BYTES = 64 * 1024 * 1024
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a job is submitted while all workers are busy and max_queue jobs are waiting."""
+
+
+class RenderService:
+    """
+    Bounded job runner: at most `workers` jobs render at once and at most `max_queue` wait.
+    Keeps counters and the durations of the last jobs for /stats.
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 8, placeholder: Path | None = None) -> None:
+        self.placeholder = placeholder or resource_path("data/placeholder.png")
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="pan_job")
+        self._workers = max(1, workers)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._timings: deque[dict[str, float]] = deque(maxlen=100)
+
+    def submit(self, xlsx_data: bytes, options: dict[str, Any]) -> Future:
+        """Queue a render job; the future resolves to (participant count, HTML bytes)."""
+        with self._lock:
+            # Jobs count from submit until a worker picks them up, so compare against both limits
+            if self._queued + self._running >= self._workers + self.max_queue:
+                self._rejected += 1
+                raise QueueFullError("Warteschlange voll, bitte später erneut versuchen.")
+            self._queued += 1
+        submitted = time.perf_counter()
+        return self._executor.submit(self._run, xlsx_data, options, submitted)
+
+    def _run(self, xlsx_data: bytes, options: dict[str, Any], submitted: float) -> tuple[int, bytes]:
+        started = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        ok = False
+        try:
+            result = self._render(xlsx_data, options)
+            ok = True
+            return result
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self._running -= 1
+                if ok:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+                self._timings.append({"wait_s": started - submitted, "run_s": finished - started})
+
+    def _render(self, xlsx_data: bytes, options: dict[str, Any]) -> tuple[int, bytes]:
+        participants = load_participants(xlsx_data, self.placeholder, keep_images_in_memory=True)
+        out = io.BytesIO()
+        render_html(
+            participants,
+            out,
+            meetup_name=options.get("meetup_name", ""),
+            group_by=options.get("group_by"),
+            search_index=bool(options.get("search")),
+        )
+        return len(participants), out.getvalue()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            runs = [t["run_s"] for t in self._timings]
+            waits = [t["wait_s"] for t in self._timings]
+            return {
+                "workers": self._workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "recent_jobs": len(runs),
+                "run_s_mean": sum(runs) / len(runs) if runs else 0.0,
+                "run_s_max": max(runs, default=0.0),
+                "wait_s_mean": sum(waits) / len(waits) if waits else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+def _options_from_query(query: str) -> dict[str, Any]:
+    params = urllib.parse.parse_qs(query)
+    group_by = params.get("group_by", [""])[0] or None
+    if group_by not in (None, "land", "plz"):
+        raise ValueError(f"Unbekanntes group_by: {group_by}")
+    return {
+        "meetup_name": params.get("meetup_name", [""])[0],
+        "group_by": group_by,
+        "search": params.get("search", ["0"])[0] in ("1", "true", "ja"),
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: _Server
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_text(self, status: int, text: str) -> None:
+        self._send(status, text.encode("utf-8"), "text/plain; charset=utf-8")
+
+    def do_GET(self) -> None:  # noqa: N802 (http.server naming)
+        if urllib.parse.urlsplit(self.path).path == "/stats":
+            body = json.dumps(self.server.service.stats()).encode("utf-8")
+            self._send(200, body, "application/json")
+        else:
+            self._send_text(404, "Nicht gefunden")
+
+    def do_POST(self) -> None:  # noqa: N802 (http.server naming)
+        url = urllib.parse.urlsplit(self.path)
+        if url.path != "/render":
+            self._send_text(404, "Nicht gefunden")
+            return
+        try:
+            options = _options_from_query(url.query)
+        except ValueError as e:
+            self._send_text(400, str(e))
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            self._send_text(400, "Ungültige Content-Length.")
+            return
+        if length <= 0 or length > MAX_UPLOAD_BYTES:
+            self._send_text(400 if length <= 0 else 413, "Excel-Datei fehlt oder ist zu groß.")
+            return
+        data = self.rfile.read(length)
+        try:
+            future = self.server.service.submit(data, options)
+        except QueueFullError as e:
+            self._send_text(503, str(e))
+            return
+        try:
+            count, html = future.result()
+        except Exception as e:
+            self._send_text(422, str(e) or type(e).__name__)
+            return
+        self._send(200, html, "text/html; charset=utf-8", {"X-Participants": str(count)})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], service: RenderService, verbose: bool = False) -> None:
+        super().__init__(address, _Handler)
+        self.service = service
+        self.verbose = verbose
+
+
+def make_server(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    workers: int = 2,
+    max_queue: int = 8,
+    verbose: bool = False,
+) -> _Server:
+    """Create (but do not start) the HTTP server; port 0 picks a free port (see server_address)."""
+    return _Server((host, port), RenderService(workers=workers, max_queue=max_queue), verbose=verbose)
+
+
+def render_remote(
+    xlsx_path: str | Path,
+    url: str = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}",
+    meetup_name: str = "",
+    group_by: str | None = None,
+    search_index: bool = False,
+    timeout: float = 300.0,
+) -> bytes:
+    """Client: upload a workbook to a running service and return the rendered HTML."""
+    query = urllib.parse.urlencode(
+        {"meetup_name": meetup_name, "group_by": group_by or "", "search": "1" if search_index else "0"}
+    )
+    request = urllib.request.Request(
+        f"{url.rstrip('/')}/render?{query}",
+        data=Path(xlsx_path).read_bytes(),
+        headers={"Content-Type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.read()
+    except urllib.error.HTTPError as e:
+        raise RuntimeError(e.read().decode("utf-8", "replace") or str(e)) from None
+
+
+def fetch_stats(url: str = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}", timeout: float = 10.0) -> dict[str, Any]:
+    """Client: queue depth, counters and job timings of a running service."""
+    with urllib.request.urlopen(f"{url.rstrip('/')}/stats", timeout=timeout) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="pan-kontaktliste-service", description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="Dienst starten")
+    serve.add_argument("--host", default=DEFAULT_HOST)
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--workers", type=int, default=2, help="Gleichzeitig laufende Aufträge")
+    serve.add_argument("--max-queue", type=int, default=8, help="Maximal wartende Aufträge")
+    serve.add_argument("-v", "--verbose", action="store_true", help="Anfragen protokollieren")
+
+    send = sub.add_parser("send", help="Excel-Datei an laufenden Dienst senden")
+    send.add_argument("xlsx", type=Path)
+    send.add_argument("-o", "--output", type=Path, required=True)
+    send.add_argument("--url", default=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}")
+    send.add_argument("--meetup-name", default="")
+    send.add_argument("--group-by", choices=("land", "plz"), default=None)
+    send.add_argument("--search", action="store_true")
+
+    stats = sub.add_parser("stats", help="Warteschlange und Laufzeiten anzeigen")
+    stats.add_argument("--url", default=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}")
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        server = make_server(args.host, args.port, args.workers, args.max_queue, args.verbose)
+        host, port = server.server_address[:2]
+        print(f"PAN Kontaktliste Dienst läuft auf http://{host}:{port} (Strg+C beendet)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            server.service.shutdown()
+        return 0
+    if args.command == "send":
+        html = render_remote(
+            args.xlsx,
+            args.url,
+            meetup_name=args.meetup_name,
+            group_by=args.group_by,
+            search_index=args.search,
+        )
+        args.output.write_bytes(html)
+        print(f"-> {args.output}")
+        return 0
+    print(json.dumps(fetch_stats(args.url), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
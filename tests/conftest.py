@@ -5,6 +5,8 @@ from pathlib import Path
 
 import openpyxl
 import pytest
+from openpyxl.drawing.image import Image as XLImage
+from openpyxl.utils import get_column_letter
 
 
 # Column headers required by excel_reader (order can vary; we use a fixed order for tests)
@@ -29,10 +31,12 @@ def build_sample_xlsx(
     tmp_path: Path,
     rows: list[dict[str, object]],
     filename: str = "sample.xlsx",
+    images: dict[int, Path] | None = None,
 ) -> Path:
     """
     Create a minimal .xlsx with HEADERS in row 1 and data rows.
     Each row dict keys must match HEADERS; missing keys become empty cells.
+    images maps an Excel row number (2 = first data row) to an image file anchored in that row.
     """
     wb = openpyxl.Workbook()
     ws = wb.active
@@ -44,6 +48,8 @@ def build_sample_xlsx(
         for col, header in enumerate(HEADERS, start=1):
             value = row_data.get(header)
             ws.cell(row=row_idx, column=col, value=value)
+    for row_idx, image_path in (images or {}).items():
+        ws.add_image(XLImage(str(image_path)), f"{get_column_letter(len(HEADERS) + 1)}{row_idx}")
     out = tmp_path / filename
     wb.save(out)
     return out
@@ -0,0 +1,99 @@
+"""Tests for cli: single list and multiple variants from one parse."""
+from __future__ import annotations
+
+from pathlib import Path
+
+from cli import main
+from tests.conftest import build_sample_xlsx
+
+ROWS = [
+    {"Teilnehmyliste": True, "Land": "DE", "Rufname/Pseudonym": "A", "Teilnehmyliste_Couch": ""},
+    {"Teilnehmyliste": True, "Land": "AT", "Rufname/Pseudonym": "B", "Teilnehmyliste_Couch": ""},
+]
+
+
+def test_cli_single_output(tmp_path: Path, placeholder_path: Path) -> None:
+    """-o writes the default list."""
+    xlsx = build_sample_xlsx(tmp_path, ROWS)
+    out = tmp_path / "out.html"
+    assert main([str(xlsx), "-o", str(out), "--placeholder", str(placeholder_path)]) == 0
+    content = out.read_text(encoding="utf-8")
+    assert "> A</p>" in content
+    assert "> B</p>" in content
+
+
+def test_cli_variants(tmp_path: Path, placeholder_path: Path) -> None:
+    """-o plus --variant renders every variant."""
+    xlsx = build_sample_xlsx(tmp_path, ROWS)
+    out, compact = tmp_path / "out.html", tmp_path / "compact.html"
+    code = main([
+        str(xlsx),
+        "-o", str(out),
+        "--variant", "contact_list_compact.html.j2", str(compact),
+        "--placeholder", str(placeholder_path),
+    ])
+    assert code == 0
+    assert "> A</p>" in out.read_text(encoding="utf-8")
+    assert "> B</p>" in compact.read_text(encoding="utf-8")
+
+
+def test_cli_no_participants(tmp_path: Path, placeholder_path: Path) -> None:
+    """No consented rows: non-zero exit code, no file written."""
+    xlsx = build_sample_xlsx(tmp_path, [{"Teilnehmyliste": False, "Land": "DE"}])
+    out = tmp_path / "out.html"
+    assert main([str(xlsx), "-o", str(out), "--placeholder", str(placeholder_path)]) == 1
+    assert not out.exists()
+
+
+def test_cli_gzip_summary(tmp_path: Path, placeholder_path: Path, capsys) -> None:
+    """.html.gz output: the run summary reports the compression ratio."""
+    xlsx = build_sample_xlsx(tmp_path, ROWS)
+    out = tmp_path / "out.html.gz"
+    assert main([str(xlsx), "-o", str(out), "--placeholder", str(placeholder_path)]) == 0
+    line = capsys.readouterr().out
+    assert "gzip" in line
+    assert "Kompression" in line
+
+
+def test_cli_header_error(tmp_path: Path, placeholder_path: Path, capsys) -> None:
+    """A missing column is reported before anything is written."""
+    import openpyxl
+
+    wb = openpyxl.Workbook()
+    wb.active.append(["Land", "Rufname/Pseudonym"])
+    xlsx = tmp_path / "bad.xlsx"
+    wb.save(xlsx)
+    out = tmp_path / "out.html"
+    assert main([str(xlsx), "-o", str(out), "--placeholder", str(placeholder_path)]) == 1
+    assert "Teilnehmyliste" in capsys.readouterr().err
+    assert not out.exists()
+
+
+def test_cli_missing_file(tmp_path: Path, placeholder_path: Path, capsys) -> None:
+    """A missing workbook is reported as a message, not a traceback."""
+    out = tmp_path / "out.html"
+    missing = tmp_path / "fehlt.xlsx"
+    assert main([str(missing), "-o", str(out), "--placeholder", str(placeholder_path)]) == 1
+    assert "fehlt.xlsx" in capsys.readouterr().err
+    assert not out.exists()
+
+
+def test_cli_not_a_workbook(tmp_path: Path, placeholder_path: Path, capsys) -> None:
+    """A file that is not an xlsx workbook is reported as a message."""
+    bogus = tmp_path / "liste.xlsx"
+    bogus.write_text("keine Tabelle", encoding="utf-8")
+    assert main([str(bogus), "-o", str(tmp_path / "out.html"), "--placeholder", str(placeholder_path)]) == 1
+    assert capsys.readouterr().err.strip()
+
+
+def test_cli_numpy_engine_unavailable(tmp_path: Path, placeholder_path: Path, capsys, monkeypatch) -> None:
+    """--thumbnail-engine numpy without numpy exits with a message."""
+    import thumbnail_numpy
+
+    monkeypatch.setattr(thumbnail_numpy, "HAS_NUMPY", False)
+    xlsx = build_sample_xlsx(tmp_path, ROWS)
+    out = tmp_path / "out.html"
+    code = main([str(xlsx), "-o", str(out), "--placeholder", str(placeholder_path), "--thumbnail-engine", "numpy"])
+    assert code == 1
+    assert "numpy" in capsys.readouterr().err
+    assert not out.exists()
@@ -1,12 +1,38 @@
 """Tests for excel_reader: consent filtering, edge cases."""
 from __future__ import annotations
 
+import io
+import re
+import zipfile
 from pathlib import Path
 
 import pytest
 
-from excel_reader import load_participants
-from tests.conftest import build_sample_xlsx
+from excel_reader import (
+    CONSENT_BILD,
+    CONSENT_LIST,
+    CONSENT_VORNAME,
+    DATA_FAMILIENNAME,
+    DATA_LAND,
+    DATA_PLZ,
+    HeaderError,
+    iter_participants,
+    load_participants,
+    resolve_headers,
+    validate_headers,
+)
+from tests.conftest import HEADERS, build_sample_xlsx
+
+
+def _set_dimension(xlsx: Path, ref: str) -> None:
+    """Overwrite the first sheet's <dimension> tag, as exporters with a wrong one do."""
+    with zipfile.ZipFile(xlsx) as archive:
+        members = {info: archive.read(info.filename) for info in archive.infolist()}
+    with zipfile.ZipFile(xlsx, "w", zipfile.ZIP_DEFLATED) as archive:
+        for info, data in members.items():
+            if info.filename == "xl/worksheets/sheet1.xml":
+                data = re.sub(rb'<dimension ref="[^"]*"', f'<dimension ref="{ref}"'.encode(), data)
+            archive.writestr(info, data)
 
 
 def test_load_participants_empty_sheet(tmp_path: Path, placeholder_path: Path) -> None:
@@ -143,3 +169,168 @@ def test_load_participants_multiple(tmp_path: Path, placeholder_path: Path) -> N
     assert len(result) == 2
     assert result[0]["rufname"] == "A"
     assert result[1]["rufname"] == "C"
+
+
+def test_iter_participants_streams_rows(tmp_path: Path, placeholder_path: Path) -> None:
+    """iter_participants yields the same participants as load_participants, lazily."""
+    xlsx = build_sample_xlsx(tmp_path, [
+        {"Teilnehmyliste": True, "Land": "DE", "Rufname/Pseudonym": "A", "Teilnehmyliste_Couch": ""},
+        {"Teilnehmyliste": True, "Land": "AT", "Rufname/Pseudonym": "B", "Teilnehmyliste_Couch": ""},
+    ])
+    out_dir = tmp_path / "out"
+    it = iter_participants(xlsx, placeholder_path, image_output_dir=out_dir)
+    first = next(it)
+    assert first["rufname"] == "A"
+    assert [p["rufname"] for p in it] == ["B"]
+
+
+@pytest.mark.parametrize("ref", ["A1:M1", "A1"])
+def test_load_participants_wrong_dimension(tmp_path: Path, placeholder_path: Path, ref: str) -> None:
+    """A stale <dimension> tag in the sheet does not hide rows or header columns."""
+    xlsx = build_sample_xlsx(tmp_path, [
+        {"Teilnehmyliste": True, "Land": "DE", "Rufname/Pseudonym": name, "Teilnehmyliste_Couch": ""}
+        for name in ("A", "B", "C")
+    ])
+    _set_dimension(xlsx, ref)
+    assert validate_headers(xlsx)[CONSENT_LIST] == 0
+    result = load_participants(xlsx, placeholder_path, keep_images_in_memory=True)
+    assert [p["rufname"] for p in result] == ["A", "B", "C"]
+
+
+def test_iter_participants_reads_images_per_row(
+    tmp_path: Path, placeholder_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Image data is read from the archive when its row is reached, not all up front."""
+    from PIL import Image
+
+    images = {}
+    for row, color in ((2, (255, 0, 0)), (3, (0, 255, 0)), (4, (0, 0, 255))):
+        images[row] = tmp_path / f"photo{row}.png"
+        Image.new("RGB", (10, 10), color=color).save(images[row])
+    xlsx = build_sample_xlsx(
+        tmp_path,
+        [{"Teilnehmyliste": True, "Teilnehmyliste Bild": True, "Land": "DE", "Rufname/Pseudonym": f"P{i}"} for i in range(3)],
+        images=images,
+    )
+    media_reads = []
+    original_read = zipfile.ZipFile.read
+
+    def read(self, name, *args, **kwargs):
+        if str(name).startswith("xl/media/"):
+            media_reads.append(name)
+        return original_read(self, name, *args, **kwargs)
+
+    monkeypatch.setattr(zipfile.ZipFile, "read", read)
+    it = iter_participants(xlsx, placeholder_path, keep_images_in_memory=True)
+    first = next(it)
+    assert len(media_reads) == 1
+    with Image.open(io.BytesIO(first["image_bytes"])) as img:
+        assert img.convert("RGB").getpixel((5, 5)) == (255, 0, 0)
+    assert len(list(it)) == 2
+    assert len(media_reads) == 3
+
+
+def test_load_participants_image_extension_from_magic_bytes(tmp_path: Path, placeholder_path: Path) -> None:
+    """Extracted images get their file extension from the image data."""
+    from PIL import Image
+
+    photo = tmp_path / "photo.jpg"
+    Image.new("RGB", (40, 40), color=(255, 0, 0)).save(photo, format="JPEG")
+    xlsx = build_sample_xlsx(
+        tmp_path,
+        [
+            {"Teilnehmyliste": True, "Teilnehmyliste Bild": True, "Land": "DE", "Rufname/Pseudonym": "Pic"},
+            {"Teilnehmyliste": True, "Teilnehmyliste Bild": False, "Land": "DE", "Rufname/Pseudonym": "NoPic"},
+        ],
+        images={2: photo, 3: photo},
+    )
+    out_dir = tmp_path / "out"
+    result = load_participants(xlsx, placeholder_path, image_output_dir=out_dir)
+    assert Path(result[0]["image_path"]).suffix == ".jpeg"
+    assert Path(result[0]["image_path"]).read_bytes()[:3] == b"\xff\xd8\xff"
+    assert Path(result[1]["image_path"]).read_bytes() == placeholder_path.read_bytes()
+
+
+def test_load_participants_in_memory(tmp_path: Path, placeholder_path: Path) -> None:
+    """Workbook bytes or file objects in, image bytes out: nothing is written to disk."""
+    from PIL import Image
+
+    photo = tmp_path / "photo.png"
+    Image.new("RGB", (20, 20), color=(0, 0, 255)).save(photo)
+    xlsx = build_sample_xlsx(
+        tmp_path,
+        [
+            {"Teilnehmyliste": True, "Teilnehmyliste Bild": True, "Land": "DE", "Rufname/Pseudonym": "Pic"},
+            {"Teilnehmyliste": True, "Land": "AT", "Rufname/Pseudonym": "NoPic"},
+        ],
+        images={2: photo},
+    )
+    data = xlsx.read_bytes()
+    for source in (data, io.BytesIO(data)):
+        result = load_participants(source, placeholder_path, keep_images_in_memory=True)
+        assert [p["rufname"] for p in result] == ["Pic", "NoPic"]
+        assert "image_path" not in result[0]
+        assert result[0]["image_bytes"][:8] == b"\x89PNG\r\n\x1a\n"
+        assert result[0]["image_bytes"] != placeholder_path.read_bytes()
+        assert result[1]["image_bytes"] == placeholder_path.read_bytes()
+
+
+def test_resolve_headers_aliases() -> None:
+    """Alternative spellings, case and extra whitespace resolve to the canonical columns."""
+    headers = [h.upper() for h in HEADERS]
+    headers[HEADERS.index("Teilnehmerliste Vorname")] = "Teilnehmyliste  Vorname"
+    columns = resolve_headers(headers)
+    assert columns[CONSENT_VORNAME] == HEADERS.index("Teilnehmerliste Vorname")
+    assert columns[DATA_LAND] == HEADERS.index("Land")
+    assert DATA_PLZ not in columns
+
+
+def test_resolve_headers_missing_with_suggestion() -> None:
+    """Missing required columns are all reported, with a close match as hint."""
+    headers = list(HEADERS)
+    headers[HEADERS.index("Teilnehmyliste Bild")] = "Teilnehmyliste Bld"
+    headers.remove("Familiename")
+    with pytest.raises(HeaderError) as excinfo:
+        resolve_headers(headers)
+    assert excinfo.value.missing == [CONSENT_BILD, DATA_FAMILIENNAME]
+    assert excinfo.value.suggestions == {CONSENT_BILD: "Teilnehmyliste Bld"}
+    assert "Teilnehmyliste Bld" in str(excinfo.value)
+
+
+def test_resolve_headers_configurable() -> None:
+    """Custom alias table and required set."""
+    columns = resolve_headers(["Name", "Stadt"], aliases={"Ort": ("Stadt",)}, required={"Ort"})
+    assert columns == {"Ort": 1}
+
+
+def test_load_participants_header_error_before_images(tmp_path: Path, placeholder_path: Path) -> None:
+    """A bad header fails fast: validate_headers and load_participants raise, nothing is extracted."""
+    import openpyxl
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append([h for h in HEADERS if h != "Teilnehmyliste"])
+    ws.append([True] * (len(HEADERS) - 1))
+    xlsx = tmp_path / "bad.xlsx"
+    wb.save(xlsx)
+    with pytest.raises(HeaderError):
+        validate_headers(xlsx)
+    out_dir = tmp_path / "out"
+    with pytest.raises(HeaderError):
+        load_participants(xlsx, placeholder_path, image_output_dir=out_dir)
+    assert not out_dir.exists()
+
+
+def test_validate_headers_ok(tmp_path: Path) -> None:
+    """validate_headers returns the resolved column map."""
+    xlsx = build_sample_xlsx(tmp_path, [])
+    assert validate_headers(xlsx)[CONSENT_LIST] == 0
+
+
+def test_validate_headers_rewinds_file_object(tmp_path: Path, placeholder_path: Path) -> None:
+    """A file object can be validated and then loaded."""
+    xlsx = build_sample_xlsx(tmp_path, [{"Teilnehmyliste": True, "Land": "DE", "Rufname/Pseudonym": "A"}])
+    with xlsx.open("rb") as f:
+        validate_headers(f)
+        result = load_participants(f, placeholder_path, keep_images_in_memory=True)
+    assert [p["rufname"] for p in result] == ["A"]
@@ -0,0 +1,45 @@
+"""Tests for image_header: format and size from magic bytes and headers."""
+from __future__ import annotations
+
+import io
+
+import pytest
+from PIL import Image
+
+from image_header import sniff_format, sniff_image
+
+
+def _encode(fmt: str, size: tuple[int, int], **save_args: object) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size, color=(10, 20, 30)).save(buf, format=fmt, **save_args)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize(
+    ("fmt", "expected", "save_args"),
+    [
+        ("PNG", "png", {}),
+        ("JPEG", "jpeg", {}),
+        ("JPEG", "jpeg", {"progressive": True}),
+        ("JPEG", "jpeg", {"exif": b"Exif\x00\x00" + b"\x00" * 64}),
+        ("GIF", "gif", {}),
+    ],
+)
+def test_sniff_image_formats(fmt: str, expected: str, save_args: dict) -> None:
+    """Format and dimensions are read from the header."""
+    data = _encode(fmt, (123, 45), **save_args)
+    assert sniff_image(data) == (expected, 123, 45)
+
+
+def test_sniff_image_unknown_and_truncated() -> None:
+    """Unknown formats and truncated headers yield None."""
+    assert sniff_image(b"") is None
+    assert sniff_image(b"BM\x00\x00") is None
+    assert sniff_image(_encode("PNG", (8, 8))[:20]) is None
+    assert sniff_image(_encode("JPEG", (8, 8))[:30]) is None
+
+
+def test_sniff_format_ignores_file_name_hints() -> None:
+    """Only magic bytes count."""
+    assert sniff_format(_encode("JPEG", (4, 4))) == "jpeg"
+    assert sniff_format(b"not an image") is None
@@ -1,11 +1,24 @@
 """Tests for render: HTML output, image data URLs, edge cases."""
 from __future__ import annotations
 
+import base64
+import gzip
+import io
+import json
+import zipfile
 from pathlib import Path
 
 import pytest
 
-from render import render_html
+from render import (
+    _environment,
+    _image_to_data_url,
+    _thumbnail_size,
+    preview_thumbnail,
+    render_html,
+    render_html_pipelined,
+    render_variants,
+)
 
 
 def test_render_html_empty_participants(tmp_path: Path, placeholder_path: Path) -> None:
@@ -92,3 +105,288 @@ def test_render_html_escapes_content(tmp_path: Path, placeholder_path: Path) ->
     content = out.read_text(encoding="utf-8")
     assert "&lt;script&gt;" in content or "<script>" not in content
     assert "&amp;" in content
+
+
+def test_render_html_pipelined_matches_render_html(tmp_path: Path, placeholder_path: Path) -> None:
+    """Pipelined mode produces the same HTML as the sequential path, in input order."""
+    participants = [
+        {"land": "DE", "rufname": f"P{i}", "couch": "", "image_path": str(placeholder_path)}
+        for i in range(20)
+    ]
+    expected = tmp_path / "expected.html"
+    render_html([dict(p) for p in participants], expected)
+    out = tmp_path / "out.html"
+    summary = render_html_pipelined(iter([dict(p) for p in participants]), out, workers=4, queue_size=2)
+    assert summary.participants == 20
+    assert out.read_text(encoding="utf-8") == expected.read_text(encoding="utf-8")
+
+
+def test_render_html_pipelined_propagates_errors(tmp_path: Path, placeholder_path: Path) -> None:
+    """An error in the parse stage surfaces in the caller."""
+
+    def broken():
+        yield {"land": "DE", "rufname": "A", "couch": "", "image_path": str(placeholder_path)}
+        raise ValueError("kaputt")
+
+    out = tmp_path / "out.html"
+    with pytest.raises(ValueError, match="kaputt"):
+        render_html_pipelined(broken(), out)
+    assert not out.exists()
+    assert not list(tmp_path.glob(".out.html.*"))
+
+
+@pytest.mark.parametrize("name", ["out.html", "out.html.gz", "out.zip"])
+def test_render_html_pipelined_error_keeps_previous_output(
+    tmp_path: Path, placeholder_path: Path, name: str
+) -> None:
+    """A failed run leaves an existing list untouched and no temporary file behind."""
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    out = out_dir / name
+    out.write_bytes(b"alte Liste")
+
+    def broken():
+        for i in range(50):
+            yield {"land": "DE", "rufname": f"P{i}", "couch": "", "image_path": str(placeholder_path)}
+        raise ValueError("kaputt")
+
+    with pytest.raises(ValueError, match="kaputt"):
+        render_html_pipelined(broken(), out)
+    assert out.read_bytes() == b"alte Liste"
+    assert list(out_dir.iterdir()) == [out]
+
+
+def test_render_html_group_by_land(tmp_path: Path, placeholder_path: Path) -> None:
+    """group_by='land' sorts cards and emits one heading per Land; empty Land goes last."""
+    participants = [
+        {"land": "DE", "plz": "2", "rufname": "D2", "couch": "", "image_path": str(placeholder_path)},
+        {"land": "", "rufname": "None", "couch": "", "image_path": str(placeholder_path)},
+        {"land": "AT", "plz": "1", "rufname": "A1", "couch": "", "image_path": str(placeholder_path)},
+        {"land": "DE", "plz": "1", "rufname": "D1", "couch": "", "image_path": str(placeholder_path)},
+    ]
+    out = tmp_path / "out.html"
+    render_html(participants, out, group_by="land")
+    content = out.read_text(encoding="utf-8")
+    assert content.count('<section class="group">') == 3
+    positions = [content.index(f"> {name}</p>") for name in ("A1", "D1", "D2", "None")]
+    assert positions == sorted(positions)
+    assert "Ohne Angabe" in content
+
+
+def test_render_html_group_by_unknown(tmp_path: Path) -> None:
+    """Unknown group_by raises ValueError."""
+    with pytest.raises(ValueError):
+        render_html([], tmp_path / "out.html", group_by="ort")
+
+
+def test_render_html_search_index(tmp_path: Path, placeholder_path: Path) -> None:
+    """search_index embeds folded search texts in card order plus the filter script."""
+    participants = [
+        {"land": "DE", "ort": "Köln", "rufname": "Jörg", "couch": "Ja", "image_path": str(placeholder_path)},
+        {"land": "AT", "rufname": "</script>", "couch": "", "image_path": str(placeholder_path)},
+    ]
+    out = tmp_path / "out.html"
+    render_html(participants, out, search_index=True)
+    content = out.read_text(encoding="utf-8")
+    assert 'id="search"' in content
+    raw = content.split('<script type="application/json" id="search-index">', 1)[1].split("</script>", 1)[0]
+    index = json.loads(raw)
+    assert index["t"] == ["jorg de koln ja", "</script> at"]
+    assert "g" not in index
+
+
+def test_render_html_without_search_index(tmp_path: Path, placeholder_path: Path) -> None:
+    """Search field and script are only emitted on request."""
+    out = tmp_path / "out.html"
+    render_html([{"land": "DE", "rufname": "A", "couch": "", "image_path": str(placeholder_path)}], out)
+    content = out.read_text(encoding="utf-8")
+    assert "search-index" not in content
+    assert "<script" not in content
+
+
+def test_render_variants_shared_parse(tmp_path: Path, placeholder_path: Path) -> None:
+    """Each variant gets its own file and thumbnail size; input dicts stay untouched."""
+    from PIL import Image
+
+    photo = tmp_path / "photo.png"
+    Image.new("RGB", (400, 400), color=(200, 0, 0)).save(photo)
+    template_dir = tmp_path / "templates"
+    template_dir.mkdir()
+    (template_dir / "big.html.j2").write_text(
+        "{% for p in participants %}{{ p.rufname }}|{{ p.image_data }}\n{% endfor %}", encoding="utf-8"
+    )
+    (template_dir / "small.html.j2").write_text(
+        "{% set thumbnail_size = 32 %}{% for p in participants %}{{ p.rufname }}|{{ p.image_data }}\n{% endfor %}",
+        encoding="utf-8",
+    )
+    participants = [{"land": "DE", "rufname": "A", "couch": "", "image_path": str(photo)}]
+    big, small = tmp_path / "big.html", tmp_path / "small.html"
+    render_variants(
+        participants,
+        [("big.html.j2", big), ("small.html.j2", small)],
+        template_dir=template_dir,
+    )
+    assert "image_data" not in participants[0]
+
+    def size_of(out: Path) -> tuple[int, int]:
+        url = out.read_text(encoding="utf-8").split("|", 1)[1].strip()
+        data = base64.b64decode(url.split(",", 1)[1])
+        with Image.open(io.BytesIO(data)) as img:
+            return img.size
+
+    assert size_of(big) == (144, 144)
+    assert size_of(small) == (32, 32)
+
+
+def test_thumbnail_size_cached_until_template_changes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """The template is parsed once; a changed file is picked up again."""
+    import os
+
+    template = tmp_path / "list.html.j2"
+    template.write_text("{% set thumbnail_size = 64 %}", encoding="utf-8")
+    env = _environment(tmp_path)
+    assert _thumbnail_size(env, "list.html.j2") == (64, 64)
+
+    parses = []
+    parse = env.parse
+    monkeypatch.setattr(env, "parse", lambda source: parses.append(source) or parse(source))
+    assert _thumbnail_size(env, "list.html.j2") == (64, 64)
+    assert parses == []
+
+    template.write_text("{% set thumbnail_size = (80, 40) %}", encoding="utf-8")
+    mtime = template.stat().st_mtime + 10
+    os.utime(template, (mtime, mtime))
+    assert _thumbnail_size(env, "list.html.j2") == (80, 40)
+    assert len(parses) == 1
+
+
+def test_render_variants_compact_template(tmp_path: Path, placeholder_path: Path) -> None:
+    """Bundled compact template extends the default one."""
+    participants = [{"land": "DE", "rufname": "Kompakt", "couch": "", "image_path": str(placeholder_path)}]
+    out = tmp_path / "compact.html"
+    render_variants(participants, [("contact_list_compact.html.j2", out)])
+    content = out.read_text(encoding="utf-8")
+    assert "Kompakt" in content
+    assert "grid-template-columns: 1fr;" in content
+
+
+def test_render_variants_compact_css_overrides_base(tmp_path: Path, placeholder_path: Path) -> None:
+    """Compact overrides come after the base .card rules in <style>, so they win the cascade."""
+    participants = [{"land": "DE", "rufname": "Kompakt", "couch": "", "image_path": str(placeholder_path)}]
+    out = tmp_path / "compact.html"
+    render_variants(participants, [("contact_list_compact.html.j2", out)])
+    style = out.read_text(encoding="utf-8").split("<style>", 1)[1].split("</style>", 1)[0]
+    assert style.index("padding: 0.5rem 0.6rem;") < style.index(".card { padding: 0.35rem 0.45rem; }")
+    assert style.index("width: 72px;") < style.index(".card-photo { width: 48px; height: 48px; }")
+
+
+def test_image_to_data_url_passthrough_small_jpeg(tmp_path: Path) -> None:
+    """A JPEG that already fits the thumbnail is embedded unchanged."""
+    from PIL import Image
+
+    avatar = tmp_path / "avatar.png"  # misleading suffix: format comes from magic bytes
+    Image.new("RGB", (100, 100), color=(0, 128, 0)).save(avatar, format="JPEG")
+    url = _image_to_data_url(avatar)
+    assert url.startswith("data:image/jpeg;base64,")
+    assert base64.b64decode(url.split(",", 1)[1]) == avatar.read_bytes()
+
+
+def test_image_to_data_url_resizes_large_image(tmp_path: Path) -> None:
+    """Images larger than the thumbnail are still resized and re-encoded as PNG."""
+    from PIL import Image
+
+    photo = tmp_path / "photo.jpg"
+    Image.new("RGB", (600, 300), color=(0, 0, 255)).save(photo, format="JPEG")
+    url = _image_to_data_url(photo)
+    assert url.startswith("data:image/png;base64,")
+    with Image.open(io.BytesIO(base64.b64decode(url.split(",", 1)[1]))) as img:
+        assert img.size == (144, 72)
+
+
+def test_image_to_data_url_cached_by_content(tmp_path: Path) -> None:
+    """Identical image content at the same size is encoded once."""
+    from PIL import Image
+
+    import render
+
+    render.clear_caches()
+    a, b = tmp_path / "a.png", tmp_path / "b.png"
+    Image.new("RGB", (300, 300), color=(1, 2, 3)).save(a)
+    b.write_bytes(a.read_bytes())
+    assert _image_to_data_url(a) == _image_to_data_url(b)
+    assert len(render._thumbnail_cache) == 1
+    _image_to_data_url(a, (32, 32))
+    assert len(render._thumbnail_cache) == 2
+
+
+def test_render_html_to_stream_from_image_bytes(placeholder_path: Path) -> None:
+    """In-memory participants render into a binary stream."""
+    participants = [
+        {"land": "DE", "rufname": "Stream", "couch": "", "image_bytes": placeholder_path.read_bytes()},
+    ]
+    out = io.BytesIO()
+    render_html(participants, out)
+    content = out.getvalue().decode("utf-8")
+    assert "Stream" in content
+    assert "data:image/png;base64," in content
+
+
+def test_render_html_gzip(tmp_path: Path, placeholder_path: Path) -> None:
+    """.html.gz output is gzip-compressed HTML; the summary reports the ratio."""
+    participants = [
+        {"land": "DE", "rufname": f"Gz{i}", "couch": "", "image_path": str(placeholder_path)} for i in range(30)
+    ]
+    plain, packed = tmp_path / "out.html", tmp_path / "out.html.gz"
+    render_html([dict(p) for p in participants], plain)
+    summary = render_html([dict(p) for p in participants], packed)
+    assert summary.output_format == "gzip"
+    assert gzip.decompress(packed.read_bytes()) == plain.read_bytes()
+    assert summary.html_bytes == plain.stat().st_size
+    assert summary.output_bytes == packed.stat().st_size
+    assert summary.compression_ratio > 1
+
+
+def test_render_html_zip_bundle(tmp_path: Path, placeholder_path: Path) -> None:
+    """.zip output bundles the HTML with each distinct thumbnail stored once."""
+    participants = [
+        {"land": "DE", "rufname": f"Zip{i}", "couch": "", "image_path": str(placeholder_path)} for i in range(3)
+    ]
+    out = tmp_path / "liste.zip"
+    summary = render_html(participants, out)
+    assert summary.output_format == "zip"
+    with zipfile.ZipFile(out) as bundle:
+        names = bundle.namelist()
+        assert names[0] == "liste.html"
+        assets = [n for n in names if n.startswith("bilder/")]
+        assert len(assets) == 1
+        html = bundle.read("liste.html").decode("utf-8")
+    assert f'src="{assets[0]}"' in html
+    assert "data:image" not in html
+    assert summary.output_bytes == out.stat().st_size
+
+
+def test_render_html_pipelined_gzip_stream(placeholder_path: Path) -> None:
+    """Pipelined rendering can stream gzip into a binary file object."""
+    participants = [{"land": "DE", "rufname": "Pipe", "couch": "", "image_path": str(placeholder_path)}]
+    buf = io.BytesIO()
+    summary = render_html_pipelined(iter(participants), buf, output_format="gzip")
+    assert b"Pipe" in gzip.decompress(buf.getvalue())
+    assert summary.output_bytes == len(buf.getvalue())
+
+
+def test_render_html_unknown_output_format(tmp_path: Path) -> None:
+    """Unknown output_format raises ValueError."""
+    with pytest.raises(ValueError):
+        render_html([], tmp_path / "out.html", output_format="bz2")
+
+
+def test_preview_thumbnail_raw_rgb(tmp_path: Path) -> None:
+    """Preview thumbnails are small raw RGB buffers; unreadable images give None."""
+    from PIL import Image
+
+    photo = tmp_path / "photo.jpg"
+    Image.new("RGB", (800, 400), color=(9, 9, 9)).save(photo, format="JPEG")
+    w, h, rgb = preview_thumbnail({"image_path": str(photo)})
+    assert (w, h) == (48, 24)
+    assert len(rgb) == w * h * 3
+    assert preview_thumbnail({"image_bytes": b"nope"}) is None
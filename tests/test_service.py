@@ -0,0 +1,83 @@
+"""Tests for service: local render service and its client."""
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+import pytest
+
+from service import QueueFullError, RenderService, fetch_stats, make_server, render_remote
+from tests.conftest import build_sample_xlsx
+
+
+@pytest.fixture
+def server_url(placeholder_path: Path):
+    server = make_server(port=0, workers=2, max_queue=4)
+    server.service.placeholder = placeholder_path
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    yield f"http://{host}:{port}"
+    server.shutdown()
+    server.server_close()
+    server.service.shutdown()
+
+
+def test_service_renders_upload(tmp_path: Path, server_url: str) -> None:
+    """Uploaded workbook comes back as HTML; stats count the job."""
+    xlsx = build_sample_xlsx(tmp_path, [
+        {"Teilnehmyliste": True, "Land": "DE", "Rufname/Pseudonym": "Remote", "Teilnehmyliste_Couch": ""},
+    ])
+    html = render_remote(xlsx, server_url, meetup_name="Diensttest", search_index=True).decode("utf-8")
+    assert "Remote" in html
+    assert "Diensttest" in html
+    assert "search-index" in html
+    stats = fetch_stats(server_url)
+    assert stats["completed"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["recent_jobs"] == 1
+
+
+def test_service_rejects_bad_upload(server_url: str, tmp_path: Path) -> None:
+    """A file that is not a workbook is reported as an error and counted as failed."""
+    bad = tmp_path / "bad.xlsx"
+    bad.write_bytes(b"not a workbook")
+    with pytest.raises(RuntimeError):
+        render_remote(bad, server_url)
+    assert fetch_stats(server_url)["failed"] == 1
+
+
+def test_service_invalid_content_length(server_url: str) -> None:
+    """A non-numeric Content-Length is answered with 400."""
+    import http.client
+    import urllib.parse
+
+    url = urllib.parse.urlsplit(server_url)
+    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=10)
+    try:
+        conn.putrequest("POST", "/render")
+        conn.putheader("Content-Length", "viel")
+        conn.endheaders()
+        response = conn.getresponse()
+        assert response.status == 400
+    finally:
+        conn.close()
+
+
+def test_service_queue_full(placeholder_path: Path) -> None:
+    """Jobs are admitted while workers are free; beyond workers + max_queue they are rejected."""
+    service = RenderService(workers=1, max_queue=0, placeholder=placeholder_path)
+    release = threading.Event()
+    service._render = lambda data, options: (release.wait(5), b"")
+    try:
+        first = service.submit(b"", {})
+        with pytest.raises(QueueFullError):
+            service.submit(b"", {})
+        assert service.stats()["rejected"] == 1
+        release.set()
+        first.result(timeout=5)
+        service.submit(b"", {}).result(timeout=5)
+        assert service.stats()["completed"] == 2
+    finally:
+        release.set()
+        service.shutdown()
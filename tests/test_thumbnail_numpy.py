@@ -0,0 +1,94 @@
+"""Tests for thumbnail_numpy: batched center-crop and area resampling."""
+from __future__ import annotations
+
+import io
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+np = pytest.importorskip("numpy")
+
+import thumbnail_numpy  # noqa: E402
+from render import render_html  # noqa: E402
+from thumbnail_numpy import _area_weights, batch_thumbnails  # noqa: E402
+
+
+def _png(size: tuple[int, int], mode: str = "RGB", color: object = (200, 100, 50)) -> bytes:
+    buf = io.BytesIO()
+    Image.new(mode, size, color=color).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _decode(thumb: tuple[bytes, str]) -> Image.Image:
+    data, mime = thumb
+    assert mime == "image/png"
+    return Image.open(io.BytesIO(data))
+
+
+def test_area_weights_rows_sum_to_one() -> None:
+    """Every output pixel is a weighted mean of the source pixels."""
+    for src, dst in ((300, 144), (145, 144), (1000, 7)):
+        weights = _area_weights(src, dst)
+        assert weights.shape == (dst, src)
+        assert np.allclose(weights.sum(axis=1), 1.0, atol=1e-5)
+
+
+def test_batch_thumbnails_crop_and_size() -> None:
+    """Output has the target size, center-cropped; colors survive resampling; order is kept."""
+    images = [_png((600, 300)), _png((300, 900), color=(0, 0, 255)), _png((600, 300))]
+    thumbs = batch_thumbnails(images, (144, 144))
+    for thumb, color in zip(thumbs, [(200, 100, 50), (0, 0, 255), (200, 100, 50)], strict=True):
+        with _decode(thumb) as img:
+            assert img.size == (144, 144)
+            assert img.getpixel((72, 72)) == color
+
+
+def test_batch_thumbnails_mixed_shapes_one_batch(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Photos of different sizes are padded into one stack and resampled together."""
+    calls = []
+    resample = thumbnail_numpy._resample
+
+    def spy(batch, *args):
+        calls.append(batch.shape[0])
+        return resample(batch, *args)
+
+    monkeypatch.setattr(thumbnail_numpy, "_resample", spy)
+    sizes = [(600, 300), (1000, 1400), (150, 150), (333, 777), (2000, 1999)]
+    thumbs = batch_thumbnails([_png(s, color=(10, 200, 90)) for s in sizes], (144, 144))
+    assert calls == [len(sizes)]
+    for thumb in thumbs:
+        with _decode(thumb) as img:
+            assert img.size == (144, 144)
+            assert img.getpixel((0, 0)) == img.getpixel((143, 143)) == (10, 200, 90)
+
+
+def test_batch_thumbnails_no_upscale_alpha_and_errors() -> None:
+    """Small images are not upscaled, alpha is kept, undecodable data gives None."""
+    thumbs = batch_thumbnails(
+        [_png((40, 60)), _png((400, 400), mode="RGBA", color=(1, 2, 3, 0)), b"broken"],
+        (144, 144),
+    )
+    with _decode(thumbs[0]) as img:
+        assert img.size == (40, 40)
+    with _decode(thumbs[1]) as img:
+        assert img.mode == "RGBA"
+        assert img.getpixel((0, 0))[3] == 0
+    assert thumbs[2] is None
+
+
+def test_render_html_numpy_engine(tmp_path: Path) -> None:
+    """render_html(thumbnail_engine='numpy') embeds the batched thumbnails."""
+    photo = tmp_path / "photo.png"
+    photo.write_bytes(_png((600, 300)))
+    participants = [{"land": "DE", "rufname": f"N{i}", "couch": "", "image_path": str(photo)} for i in range(3)]
+    out = tmp_path / "out.html"
+    render_html(participants, out, thumbnail_engine="numpy")
+    assert all(p["image_data"].startswith("data:image/png;base64,") for p in participants)
+    assert len({p["image_data"] for p in participants}) == 1
+
+
+def test_render_html_unknown_engine(tmp_path: Path) -> None:
+    """Unknown thumbnail_engine raises ValueError."""
+    with pytest.raises(ValueError):
+        render_html([{"land": "DE", "rufname": "X", "couch": "", "image_path": "x"}], tmp_path / "o.html", thumbnail_engine="gpu")